@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pathological-input latency benchmark for the deadline-bounded search.
+
+Builds long unbroken strings of short, fuzzy-ambiguous syllables (the
+inputs that make greedySegment probe every prefix length with fuzzy
+expansion) and compares per-query latency of the unbounded search with
+ThaiPhoneticEngine.search(..., deadline=...).
+
+For results cut short by the deadline it also checks quality: the
+truncated top-k is compared with the unbounded top-k for the same covered
+input (the first `consumed` characters), as the share with the same top-1
+and the mean share of the unbounded top-k that was kept.
+
+Usage:
+    python benchmarks/bench_deadline.py [--deadline-ms 10] [--queries 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from thai_phonetic_engine import ThaiPhoneticEngine  # noqa: E402
+
+# Syllables that hit the t/s/d, i/ee/y, a/aa and b/p fuzzy rules
+AMBIGUOUS_SYLLABLES = ["ta", "sa", "da", "ti", "si", "di", "tee", "see", "pa", "ba", "pi", "bi", "naa", "mai", "tao"]
+
+
+def pathological_inputs(count: int, min_length: int, max_length: int, seed: int = 0):
+    """Deterministic list of long syllable strings."""
+    rng = random.Random(seed)
+    inputs = []
+    for _ in range(count):
+        target = rng.randint(min_length, max_length)
+        parts = []
+        while sum(len(p) for p in parts) < target:
+            parts.append(rng.choice(AMBIGUOUS_SYLLABLES))
+        inputs.append("".join(parts))
+    return inputs
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run(engine, inputs, deadline):
+    """(sorted latencies, partial results as (input, result) pairs)"""
+    latencies = []
+    partial = []
+    for text in inputs:
+        start = time.perf_counter()
+        result = engine.search(text, deadline)
+        latencies.append(time.perf_counter() - start)
+        if result.partial:
+            partial.append((text, result))
+    latencies.sort()
+    return latencies, partial
+
+
+def compare_with_unbounded(engine, partial):
+    """(share with the same top-1, mean share of the unbounded top-k kept) over partial results."""
+    same_top1 = 0
+    kept = 0.0
+    compared = 0
+    for text, result in partial:
+        if not result.candidates:
+            continue
+        reference = engine.search(text[:result.consumed]).candidates
+        if not reference:
+            continue
+        compared += 1
+        same_top1 += result.candidates[0] == reference[0]
+        kept += len(set(result.candidates) & set(reference)) / len(reference)
+    if not compared:
+        return None, None
+    return same_top1 / compared, kept / compared
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--deadline-ms", type=float, nargs="+", default=[2.0, 5.0, 10.0])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--min-length", type=int, default=60)
+    parser.add_argument("--max-length", type=int, default=600)
+    args = parser.parse_args()
+
+    print("Loading engine...")
+    engine = ThaiPhoneticEngine.from_files()
+    inputs = pathological_inputs(args.queries, args.min_length, args.max_length)
+    print(f"{len(inputs)} inputs, {args.min_length}-{args.max_length} characters\n")
+
+    print(f"{'deadline':>10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'partial':>8} {'top-1 =':>8} {'top-k kept':>11}")
+    for deadline_ms in [None] + args.deadline_ms:
+        deadline = None if deadline_ms is None else deadline_ms / 1000.0
+        latencies, partial = run(engine, inputs, deadline)
+        label = "none" if deadline_ms is None else f"{deadline_ms:g} ms"
+        same_top1, kept = compare_with_unbounded(engine, partial)
+        quality = "       -            -" if same_top1 is None else f"{same_top1 * 100:7.1f}% {kept * 100:10.1f}%"
+        print(f"{label:>10} {percentile(latencies, 0.5) * 1000:8.2f} {percentile(latencies, 0.99) * 1000:8.2f} "
+              f"{latencies[-1] * 1000:8.2f} {len(partial):8d} {quality}")
+        if deadline_ms is not None and latencies[-1] > deadline * 2:
+            print(f"  ✗ max latency exceeds 2× the {deadline_ms:g} ms deadline")
+
+
+if __name__ == '__main__':
+    main()
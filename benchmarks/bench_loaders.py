@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Load-time benchmark for the dictionary and n-gram files across formats.
+
+Converts dictionary.json and ngram_frequencies.json into each format in a
+temporary directory, then loads every (file, format) pair in a fresh
+process and reports file size, median load time and tracemalloc peak:
+- json:      the file as shipped (json.load)
+- minified:  key-sorted, no whitespace (export_dictionary_json --format=minified)
+- jsonl:     one JSON array per line (--format=jsonl), parsed line by line
+- ijson:     streaming parse of the minified file (skipped if ijson is missing)
+- marshal / pickle: binary forms of the loaded dict
+
+Usage:
+    python benchmarks/bench_loaders.py [--dictionary path] [--ngrams path] [--repeats 5]
+"""
+
+import argparse
+import json
+import marshal
+import os
+import pickle
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from export_dictionary_json import write_dictionary  # noqa: E402
+from thai_phonetic_engine import DEFAULT_DICTIONARY_PATH, DEFAULT_NGRAM_PATH  # noqa: E402
+
+FORMATS = ["json", "minified", "jsonl", "ijson", "marshal", "pickle"]
+
+# Format → file name suffix of its converted copy
+SUFFIXES = {
+    "json": ".json",
+    "minified": ".min.json",
+    "jsonl": ".jsonl",
+    "ijson": ".min.json",
+    "marshal": ".marshal",
+    "pickle": ".pickle",
+}
+
+
+def write_jsonl(data: dict, path: str):
+    """
+    Line-oriented form of either file.
+
+    The dictionary becomes ["key", [words]] lines (as export_dictionary_json
+    writes it); the n-gram file, a dict of sections, becomes
+    ["section", "key", count] lines.
+    """
+    if all(isinstance(v, dict) for v in data.values()):
+        with open(path, 'w', encoding='utf-8') as f:
+            for section, entries in data.items():
+                for key in sorted(entries):
+                    f.write(json.dumps([section, key, entries[key]], ensure_ascii=False, separators=(',', ':')))
+                    f.write('\n')
+    else:
+        write_dictionary(data, path, "jsonl")
+
+
+def load_jsonl(path: str) -> dict:
+    loads = json.loads
+    data = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            row = loads(line)
+            if len(row) == 3:
+                data.setdefault(row[0], {})[row[1]] = row[2]
+            else:
+                data[row[0]] = row[1]
+    return data
+
+
+def load_ijson(path: str) -> dict:
+    import ijson
+    with open(path, 'rb') as f:
+        first = f.read(64).lstrip()
+        f.seek(0)
+        # The n-gram file is {"bigrams": {...}, "trigrams": {...}}
+        if first.startswith(b'{"bigrams"'):
+            data = {}
+            for section in ("bigrams", "trigrams"):
+                f.seek(0)
+                data[section] = dict(ijson.kvitems(f, section))
+            return data
+        return dict(ijson.kvitems(f, ""))
+
+
+def load(fmt: str, path: str) -> dict:
+    if fmt in ("json", "minified"):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    if fmt == "jsonl":
+        return load_jsonl(path)
+    if fmt == "ijson":
+        return load_ijson(path)
+    if fmt == "marshal":
+        # marshal.load() on a file object reads it piecemeal and is ~3x slower
+        with open(path, 'rb') as f:
+            return marshal.loads(f.read())
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def child(fmt: str, path: str, repeats: int):
+    """Time `repeats` loads, then one more under tracemalloc; prints JSON."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        data = load(fmt, path)
+        times.append(time.perf_counter() - start)
+        del data
+
+    tracemalloc.start()
+    data = load(fmt, path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(json.dumps({"load_ms": statistics.median(times) * 1000, "peak_mb": peak / (1024 * 1024),
+                      "entries": len(data)}))
+
+
+def convert(source_path: str, tmp: str, name: str) -> dict:
+    """Write every format of one file into `tmp`; returns format → path."""
+    with open(source_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    paths = {fmt: os.path.join(tmp, name + SUFFIXES[fmt]) for fmt in FORMATS}
+    paths["json"] = source_path
+    write_dictionary(data, paths["minified"], "minified")
+    write_jsonl(data, paths["jsonl"])
+    with open(paths["marshal"], 'wb') as f:
+        marshal.dump(data, f)
+    with open(paths["pickle"], 'wb') as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dictionary / n-gram loader benchmark")
+    parser.add_argument("--dictionary", default=DEFAULT_DICTIONARY_PATH)
+    parser.add_argument("--ngrams", default=DEFAULT_NGRAM_PATH)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--child", nargs=3, metavar=("FORMAT", "PATH", "REPEATS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        fmt, path, repeats = args.child
+        child(fmt, path, int(repeats))
+        return
+
+    try:
+        import ijson  # noqa: F401
+        has_ijson = True
+    except ImportError:
+        has_ijson = False
+
+    with tempfile.TemporaryDirectory(prefix="thai-loaders-") as tmp:
+        for name, source in (("dictionary", args.dictionary), ("ngram_frequencies", args.ngrams)):
+            paths = convert(source, tmp, name)
+            print(f"\n{name}")
+            print(f"{'format':<10} {'size KB':>9} {'load ms':>9} {'peak MB':>9}")
+            for fmt in FORMATS:
+                size_kb = os.path.getsize(paths[fmt]) / 1024
+                if fmt == "ijson" and not has_ijson:
+                    print(f"{fmt:<10} {size_kb:9.0f} {'skipped (ijson not installed)':>30}")
+                    continue
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--child", fmt, paths[fmt], str(args.repeats)],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                r = json.loads(output.strip().splitlines()[-1])
+                print(f"{fmt:<10} {size_kb:9.0f} {r['load_ms']:9.1f} {r['peak_mb']:9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lookup cost of overlay dictionaries.
+
+Builds synthetic overlays (half of their keys shadow base keys, half are
+new) and measures, for 0..N overlays:
+- dictionary.get() per lookup (the plain base dict is the baseline) over a mix of base keys, overlay keys and
+  misses, on the first pass (merges computed) and on later passes (cached)
+- engine.get_candidates() per query (exact, fuzzy and segmented inputs)
+- the time to hot-reload one changed overlay (engine.reload_overlays()),
+  against loading the base
+
+Usage:
+    python benchmarks/bench_overlays.py [--overlays 0 1 2 4 8] [--overlay-keys 2000]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from overlay_dictionary import LayeredDictionary  # noqa: E402
+from thai_phonetic_engine import DEFAULT_DICTIONARY_PATH, ThaiPhoneticEngine  # noqa: E402
+
+
+def write_overlay(path: str, base_keys, words, n_keys: int, seed: int):
+    rng = random.Random(seed)
+    shadowed = rng.sample(base_keys, n_keys // 2)
+    new = [f"{rng.choice(base_keys)}x{seed}{i}" for i in range(n_keys - len(shadowed))]
+    entries = {key: rng.sample(words, rng.randint(1, 4)) for key in shadowed + new}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f, ensure_ascii=False)
+    return list(entries)
+
+
+def time_lookups(dictionary, keys, passes: int = 3):
+    """Seconds per lookup for the first pass and the best later pass."""
+    get = dictionary.get
+    times = []
+    for _ in range(passes):
+        start = time.perf_counter()
+        for key in keys:
+            get(key)
+        times.append((time.perf_counter() - start) / len(keys))
+    return times[0], min(times[1:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Overlay dictionary lookup benchmark")
+    parser.add_argument("--dictionary", default=DEFAULT_DICTIONARY_PATH)
+    parser.add_argument("--overlays", type=int, nargs="+", default=[0, 1, 2, 4, 8])
+    parser.add_argument("--overlay-keys", type=int, default=2000)
+    parser.add_argument("--lookups", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with open(args.dictionary, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    base_seconds = time.perf_counter() - start
+    base_keys = sorted(base)
+    words = sorted({word for candidates in base.values() for word in candidates})
+    print(f"Base: {len(base):,} keys, loaded in {base_seconds * 1000:.0f} ms")
+
+    rng = random.Random(0)
+    engine_inputs = (rng.sample(base_keys, args.queries // 2)
+                     + [key.replace("aa", "a") + "h" for key in rng.sample(base_keys, args.queries // 4)]
+                     + ["".join(rng.sample(base_keys, 3)) for _ in range(args.queries // 4)])
+
+    with tempfile.TemporaryDirectory(prefix="thai-overlays-") as tmp:
+        paths, overlay_keys = [], []
+        for i in range(max(args.overlays, default=0)):
+            path = os.path.join(tmp, f"overlay{i}.json")
+            overlay_keys.extend(write_overlay(path, base_keys, words, args.overlay_keys, seed=i + 1))
+            paths.append(path)
+
+        lookup_keys = (rng.choices(base_keys, k=args.lookups * 8 // 10)
+                       + rng.choices(overlay_keys or base_keys, k=args.lookups // 10)
+                       + [f"zz{i}" for i in range(args.lookups // 10)])
+        rng.shuffle(lookup_keys)
+
+        print(f"\n{'overlays':>8} {'get ns (1st)':>13} {'get ns':>8} {'+ns':>6} {'query µs':>9} {'+%':>6}")
+        baseline_get = baseline_query = None
+        for label, n in [("plain", None)] + [(str(n), n) for n in args.overlays]:
+            if n is None:
+                dictionary = base
+            else:
+                dictionary = LayeredDictionary(base)
+                for i in range(n):
+                    dictionary.add_overlay(paths[i], weight=i % 3)
+            first, warm = time_lookups(dictionary, lookup_keys)
+
+            engine = ThaiPhoneticEngine(dictionary)
+            for text in engine_inputs:
+                engine.get_candidates(text)
+            query_times = []
+            for _ in range(3):
+                start = time.perf_counter()
+                for text in engine_inputs:
+                    engine.get_candidates(text)
+                query_times.append((time.perf_counter() - start) / len(engine_inputs))
+            query = statistics.median(query_times)
+
+            if baseline_get is None:
+                baseline_get, baseline_query = warm, query
+            print(f"{label:>8} {first * 1e9:13.0f} {warm * 1e9:8.0f} {(warm - baseline_get) * 1e9:6.0f} "
+                  f"{query * 1e6:9.1f} {(query / baseline_query - 1) * 100:5.1f}%")
+
+        if paths:
+            dictionary = LayeredDictionary(base)
+            for path in paths:
+                dictionary.add_overlay(path)
+            engine = ThaiPhoneticEngine(dictionary)
+            reload_times = []
+            for seed in range(100, 105):
+                write_overlay(paths[0], base_keys, words, args.overlay_keys, seed=seed)
+                start = time.perf_counter()
+                reloaded = engine.reload_overlays()
+                reload_times.append(time.perf_counter() - start)
+            print(f"\nReloaded {', '.join(reloaded)} ({args.overlay_keys:,} keys) in "
+                  f"{statistics.median(reload_times) * 1000:.1f} ms median "
+                  f"(base load: {base_seconds * 1000:.0f} ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Segmentation probe benchmark: no filter vs exact prefix set (built from the
+dictionary, and loaded from the exported key list) vs Bloom filter.
+
+Runs long inputs (concatenated dictionary keys and pathological
+ambiguous-syllable strings) through the segmenter and reports dictionary
+probes, prefix attempts and time per configuration, plus how many
+results differ from the unfiltered engine (should be 0: the filter never
+rejects a real match).
+
+Usage:
+    python benchmarks/bench_prefix_filter.py [--queries 500] [--fp-rates 0.01 0.1]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from bench_deadline import pathological_inputs  # noqa: E402
+from prefix_filter import PrefixFilter, export_prefix_filter, export_prefix_keys  # noqa: E402
+from thai_phonetic_engine import ThaiPhoneticEngine  # noqa: E402
+
+
+def key_concatenations(keys, count, words, seed=0):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(keys) for _ in range(words)) for _ in range(count)]
+
+
+def run(engine, inputs):
+    stats = engine.enable_stats()
+    stats.reset()
+    start = time.perf_counter()
+    results = [engine.greedy_segment(text) for text in inputs]
+    seconds = time.perf_counter() - start
+
+    # Counters are collected separately so timing excludes instrumentation
+    probes = attempts = 0
+    for text in inputs:
+        query = stats.begin_query()
+        engine.greedy_segment(text, query)
+        probes += query["dictionary_probes"]
+        attempts += query["segment_prefix_attempts"]
+    engine.stats = None
+    return results, seconds, probes, attempts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prefix filter probe benchmark")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--words", type=int, default=8, help="Keys per concatenated input")
+    parser.add_argument("--fp-rates", type=float, nargs="*", default=[0.01, 0.1])
+    args = parser.parse_args()
+
+    print("Loading engine...")
+    engine = ThaiPhoneticEngine.from_files(ngram_path=None)
+    keys = sorted(engine.dictionary)
+    inputs = key_concatenations(keys, args.queries, args.words) + pathological_inputs(args.queries // 5, 60, 200)
+    print(f"{len(inputs)} inputs, mean length {sum(map(len, inputs)) / len(inputs):.0f} characters\n")
+
+    configs = [("none", None)]
+    start = time.perf_counter()
+    configs.append(("exact set", PrefixFilter.from_keys(keys)))
+    print(f"Exact prefix set built in {time.perf_counter() - start:.2f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "prefix_filter.txt")
+        export_prefix_keys(keys, path)
+        start = time.perf_counter()
+        configs.append(("exact file", PrefixFilter.load(path)))
+        print(f"Exact key list: {os.path.getsize(path) / 1024:.0f} KB, "
+              f"loaded in {time.perf_counter() - start:.2f}s")
+
+        for fp_rate in args.fp_rates:
+            path = os.path.join(tmp, f"prefix-{fp_rate}.bloom")
+            bloom = export_prefix_filter(keys, path, fp_rate)
+            print(f"Bloom fp={fp_rate:g}: {os.path.getsize(path) / 1024:.0f} KB, {bloom.n_hashes} hashes")
+            configs.append((f"bloom {fp_rate:g}", PrefixFilter.load(path)))
+
+    print(f"\n{'filter':<12} {'probes':>10} {'attempts':>10} {'ms':>9} {'speedup':>8} {'diffs':>6}")
+    baseline_results = baseline_seconds = None
+    for label, prefix_filter in configs:
+        engine.prefix_filter = prefix_filter
+        results, seconds, probes, attempts = run(engine, inputs)
+        if baseline_results is None:
+            baseline_results, baseline_seconds = results, seconds
+        diffs = sum(a != b for a, b in zip(results, baseline_results))
+        print(f"{label:<12} {probes:>10,} {attempts:>10,} {seconds * 1000:9.1f} "
+              f"{baseline_seconds / seconds:7.1f}× {diffs:>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cold-start and memory benchmark: monolithic vs sharded dictionary.
+
+Shards the shipped dictionary.json into a temporary directory, then runs
+each configuration in a fresh process and reports:
+- time to first candidate (load + first get_candidates call)
+- steady-state RSS after a mixed lookup workload
+- shards loaded / evicted for the sharded variants
+
+Usage:
+    python benchmarks/bench_sharded_load.py [--dictionary path] [--queries 2000]
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from thai_phonetic_engine import DEFAULT_DICTIONARY_PATH, ThaiPhoneticEngine  # noqa: E402
+
+FIRST_INPUT = "sawatdee"
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process (Linux /proc, falls back to peak RSS)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def child(dictionary_path: str, max_bytes: int, workload_path: str):
+    """Measure one configuration inside a fresh interpreter; prints JSON."""
+    baseline_rss = current_rss_mb()
+    start = time.perf_counter()
+    engine = ThaiPhoneticEngine.from_files(dictionary_path, ngram_path=None, max_shard_bytes=max_bytes)
+    engine.get_candidates(FIRST_INPUT)
+    first_candidate = time.perf_counter() - start
+
+    with open(workload_path, 'r', encoding='utf-8') as f:
+        workload = json.load(f)
+    start = time.perf_counter()
+    for text in workload:
+        engine.get_candidates(text)
+    workload_seconds = time.perf_counter() - start
+
+    dictionary = engine.dictionary
+    print(json.dumps({
+        "first_candidate_ms": first_candidate * 1000,
+        "workload_ms": workload_seconds * 1000,
+        "rss_mb": current_rss_mb() - baseline_rss,
+        "shard_loads": getattr(dictionary, "shard_loads", None),
+        "shard_evictions": getattr(dictionary, "shard_evictions", None),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monolithic vs sharded dictionary load benchmark")
+    parser.add_argument("--dictionary", default=DEFAULT_DICTIONARY_PATH)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--caps-mb", type=float, nargs="*", default=[0.5, 1.0])
+    parser.add_argument("--child", nargs=3, metavar=("DICTIONARY", "MAX_BYTES", "WORKLOAD"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        dictionary_path, max_bytes, workload_path = args.child
+        child(dictionary_path, int(max_bytes) if max_bytes != "none" else None, workload_path)
+        return
+
+    from export_dictionary_json import export_sharded_dictionary
+
+    with open(args.dictionary, 'r', encoding='utf-8') as f:
+        dictionary = json.load(f)
+
+    with tempfile.TemporaryDirectory(prefix="thai-shards-") as tmp:
+        shard_dir = os.path.join(tmp, "shards")
+        start = time.perf_counter()
+        manifest = export_sharded_dictionary(dictionary, shard_dir)
+        print(f"Sharded {len(dictionary):,} keys into {len(manifest['shards'])} shards "
+              f"in {time.perf_counter() - start:.2f}s")
+
+        # Zipf-ish workload: most lookups hit a few common keys, plus segmentation inputs
+        rng = random.Random(0)
+        keys = sorted(dictionary)
+        hot = rng.sample(keys, 200)
+        workload = []
+        for _ in range(args.queries):
+            if rng.random() < 0.8:
+                workload.append(rng.choice(hot))
+            elif rng.random() < 0.5:
+                workload.append(rng.choice(keys))
+            else:
+                workload.append(rng.choice(hot) + rng.choice(hot))
+        workload_path = os.path.join(tmp, "workload.json")
+        with open(workload_path, 'w', encoding='utf-8') as f:
+            json.dump(workload, f)
+
+        configs = [("monolithic", args.dictionary, "none"), ("sharded", shard_dir, "none")]
+        for cap in args.caps_mb:
+            configs.append((f"sharded ≤{cap:g} MB", shard_dir, str(int(cap * 1024 * 1024))))
+
+        print(f"\n{'configuration':<18} {'first cand ms':>14} {'workload ms':>12} {'RSS MB':>8} "
+              f"{'loads':>6} {'evictions':>9}")
+        for label, path, cap in configs:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", path, cap, workload_path],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            r = json.loads(output.strip().splitlines()[-1])
+            loads = "-" if r["shard_loads"] is None else r["shard_loads"]
+            evictions = "-" if r["shard_evictions"] is None else r["shard_evictions"]
+            print(f"{label:<18} {r['first_candidate_ms']:14.1f} {r['workload_ms']:12.1f} {r['rss_mb']:8.1f} "
+                  f"{loads:>6} {evictions:>9}")
+
+
+if __name__ == '__main__':
+    main()
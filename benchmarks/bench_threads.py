@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Throughput scaling of one shared engine across threads.
+
+Loads a single frozen ThaiPhoneticEngine and runs a mixed workload over
+a ThreadPoolExecutor with 1..N threads. The workload has exact keys, fuzzy
+variants, multi-key segmentations and ambiguous-syllable strings. Each
+thread takes an interleaved slice of the inputs. For each thread count the
+script reports queries/s, the speedup over one thread, and results that
+differ from a single-threaded reference run (there should be none).
+
+On a standard CPython build the GIL serializes the pure-Python engine, so
+expect a flat speedup. On a free-threaded build (python3.13t and later)
+it should scale with cores. --interpreters runs the same benchmark under
+several interpreters and prints one table per build:
+
+    python benchmarks/bench_threads.py --interpreters python3.13 python3.13t
+
+Usage:
+    python benchmarks/bench_threads.py [--threads 1 2 4 8] [--queries 4000] [--stats]
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import sysconfig
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from bench_deadline import pathological_inputs  # noqa: E402
+from thai_phonetic_engine import DEFAULT_DICTIONARY_PATH, DEFAULT_NGRAM_PATH, ThaiPhoneticEngine  # noqa: E402
+
+
+def build_info() -> str:
+    free_threaded = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+    gil_enabled = sys._is_gil_enabled() if hasattr(sys, "_is_gil_enabled") else True
+    build = "free-threaded" if free_threaded else "standard"
+    return f"Python {sys.version.split()[0]} {build}, GIL {'on' if gil_enabled else 'off'}"
+
+
+def workload(keys, count: int, seed: int = 0):
+    """Deterministic, shuffled mix of query kinds."""
+    rng = random.Random(seed)
+    exact = rng.sample(keys, count * 4 // 10)
+    fuzzy = [key.replace("aa", "a").replace("ee", "i") + "h" for key in rng.sample(keys, count * 2 // 10)]
+    segmented = ["".join(rng.sample(keys, rng.randint(2, 4))) for _ in range(count * 3 // 10)]
+    inputs = exact + fuzzy + segmented + pathological_inputs(count // 10, 20, 40, seed)
+    rng.shuffle(inputs)
+    return inputs
+
+
+def run_threads(engine, inputs, n_threads: int):
+    """(seconds, results in input order) with each thread on an interleaved slice."""
+    def worker(offset: int):
+        get_candidates = engine.get_candidates
+        return [get_candidates(text) for text in inputs[offset::n_threads]]
+
+    with ThreadPoolExecutor(max_workers=n_threads) as pool:
+        start = time.perf_counter()
+        slices = list(pool.map(worker, range(n_threads)))
+        seconds = time.perf_counter() - start
+
+    results = [None] * len(inputs)
+    for offset, slice_results in enumerate(slices):
+        results[offset::n_threads] = slice_results
+    return seconds, results
+
+
+def bench(args) -> dict:
+    engine = ThaiPhoneticEngine.from_files(args.dictionary, args.ngrams, args.model).freeze()
+    if args.stats:
+        engine.enable_stats()
+    inputs = workload(sorted(engine.dictionary), args.queries)
+
+    reference = [engine.get_candidates(text) for text in inputs]
+    rows = []
+    for n_threads in args.threads:
+        best, results = None, None
+        for _ in range(args.repeats):
+            seconds, results = run_threads(engine, inputs, n_threads)
+            best = seconds if best is None else min(best, seconds)
+        rows.append({
+            "threads": n_threads,
+            "qps": len(inputs) / best,
+            "diffs": sum(a != b for a, b in zip(results, reference)),
+        })
+    return {"build": build_info(), "cpus": os.cpu_count(), "queries": len(inputs), "rows": rows}
+
+
+def print_report(report: dict):
+    print(f"\n{report['build']} ({report['cpus']} CPUs, {report['queries']:,} queries)")
+    print(f"{'threads':>7} {'queries/s':>10} {'speedup':>8} {'diffs':>6}")
+    base_qps = report["rows"][0]["qps"]
+    for row in report["rows"]:
+        print(f"{row['threads']:>7} {row['qps']:10.0f} {row['qps'] / base_qps:7.2f}× {row['diffs']:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared-engine thread scaling benchmark")
+    parser.add_argument("--dictionary", default=DEFAULT_DICTIONARY_PATH)
+    parser.add_argument("--ngrams", default=DEFAULT_NGRAM_PATH)
+    parser.add_argument("--model", default=None, help="Quantized ngram_model.json")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--queries", type=int, default=4000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--stats", action="store_true", help="Run with EngineStats attached")
+    parser.add_argument("--interpreters", nargs="+", help="Run under these Python executables")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(bench(args)))
+        return
+
+    if not args.interpreters:
+        print_report(bench(args))
+        return
+
+    forwarded = [arg for arg in sys.argv[1:] if arg not in args.interpreters and arg != "--interpreters"]
+    for interpreter in args.interpreters:
+        if shutil.which(interpreter) is None:
+            print(f"\n{interpreter}: not found")
+            continue
+        completed = subprocess.run([interpreter, os.path.abspath(__file__), "--child"] + forwarded,
+                                   capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(f"\n{interpreter}: failed\n{completed.stderr.strip()}")
+            continue
+        print_report(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared engine workload with expected outputs from the Python reference.
+
+Builds a large, deterministic set of inputs from the dictionary and n-gram
+files and records what ThaiPhoneticEngine answers for each one, so the
+Kotlin and Swift engines can replay the same file in their tests and
+benchmarks and compare both results and latency. Kinds of input:
+- exact:        dictionary keys
+- fuzzy:        fuzzy variants of keys that are not keys themselves
+- segmented:    2-4 concatenated keys
+- pathological: long ambiguous-syllable strings (see bench_deadline.py)
+- miss:         consonant runs that are not keys and get no candidates
+
+The output is JSON Lines. The first line is a header with the seed, the
+SHA-1 of both data files and counts per kind and path. Every further line
+is one case:
+
+    {"id": "segmented-00012", "kind": "segmented", "input": "pomginkao",
+     "path": "segmented", "expected": ["ผมกินข้าว", ...],
+     "probes": {"dictionary_probes": 41, "fuzzy_variants": 30,
+                "segment_prefix_attempts": 12, "combinations_scored": 27}}
+
+"expected" is the full candidate list in order. "probes" are the
+EngineStats counters for that query, as a reference for how much work a
+port does on the same input. The same seed and data files always give the
+same file. --verify replays a file against the Python engine and reports
+mismatches and latency per kind.
+
+Usage:
+    python benchmarks/engine_workload.py [--cases 5000] [--seed 0] [--output engine_workload.jsonl]
+    python benchmarks/engine_workload.py --verify engine_workload.jsonl
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from bench_deadline import pathological_inputs  # noqa: E402
+from evaluate_engine import _file_sha1  # noqa: E402
+from thai_phonetic_engine import (  # noqa: E402
+    DEFAULT_DICTIONARY_PATH, DEFAULT_NGRAM_PATH, ThaiPhoneticEngine, generate_fuzzy_variants,
+)
+
+DEFAULT_OUTPUT_PATH = os.path.join(REPO_DIR, "benchmarks", "engine_workload.jsonl")
+
+WORKLOAD_FORMAT = "engine-workload"
+WORKLOAD_VERSION = 1
+
+# Share of the cases per kind
+KIND_SHARES = {
+    "exact": 0.35,
+    "fuzzy": 0.2,
+    "segmented": 0.3,
+    "pathological": 0.1,
+    "miss": 0.05,
+}
+
+# EngineStats counters recorded per case
+PROBE_COUNTERS = ("dictionary_probes", "fuzzy_variants", "segment_prefix_attempts", "combinations_scored")
+
+MISS_LETTERS = "bcdfgjklmnpqrstvwxz"
+
+# Random draws per requested case before a kind gives up
+MAX_ATTEMPTS_PER_CASE = 50
+
+
+def generate_inputs(keys: List[str], cases: int, seed: int,
+                    engine: ThaiPhoneticEngine = None) -> List[Tuple[str, str]]:
+    """
+    Deterministic (kind, input) pairs, unique by input.
+
+    Every kind draws at most MAX_ATTEMPTS_PER_CASE times its target, so a
+    small dictionary gives fewer cases instead of looping forever; the
+    shortfall per kind is printed.
+
+    Args:
+        keys: Sorted dictionary keys
+        cases: Approximate total number of cases
+        seed: Random seed
+        engine: Engine the misses are checked against (None = keys only)
+
+    Returns:
+        (kind, input) pairs in generation order
+    """
+    rng = random.Random(seed)
+    key_set = set(keys)
+    targets = {kind: int(cases * share) for kind, share in KIND_SHARES.items()}
+    inputs: Dict[str, str] = {}
+
+    def add(kind: str, text: str) -> bool:
+        if text in inputs:
+            return False
+        inputs[text] = kind
+        return True
+
+    def fill(kind: str, draw: Callable[[], Optional[str]]) -> int:
+        """Add drawn inputs (None = rejected draw) until the target or the attempt cap."""
+        n = attempts = 0
+        while n < targets[kind] and attempts < targets[kind] * MAX_ATTEMPTS_PER_CASE:
+            attempts += 1
+            text = draw()
+            if text is not None:
+                n += add(kind, text)
+        return n
+
+    def draw_fuzzy() -> Optional[str]:
+        # Variants of real keys the dictionary does not contain
+        variants = [v for v in generate_fuzzy_variants(rng.choice(keys)) if v not in key_set]
+        return rng.choice(variants) if variants else None
+
+    def draw_segmented() -> Optional[str]:
+        text = "".join(rng.choice(keys) for _ in range(rng.randint(2, 4)))
+        return None if text in key_set else text
+
+    def draw_miss() -> Optional[str]:
+        text = "".join(rng.choice(MISS_LETTERS) for _ in range(rng.randint(3, 12)))
+        if text in key_set or text in inputs or (engine is not None and engine.get_candidates(text)):
+            return None
+        return text
+
+    made = {
+        "exact": fill("exact", lambda: rng.choice(keys)),
+        "fuzzy": fill("fuzzy", draw_fuzzy),
+        "segmented": fill("segmented", draw_segmented),
+        "pathological": sum(add("pathological", text)
+                            for text in pathological_inputs(targets["pathological"], 40, 160, seed)),
+        "miss": fill("miss", draw_miss),
+    }
+    for kind, n in made.items():
+        if n < targets[kind]:
+            print(f"  {kind}: only {n:,} of {targets[kind]:,} unique inputs found")
+
+    return [(kind, text) for text, kind in inputs.items()]
+
+
+def run_cases(engine: ThaiPhoneticEngine, inputs: List[Tuple[str, str]]) -> Iterator[Dict]:
+    """Answer every input and capture its path, candidates and probe counters."""
+    records: List[Dict] = []
+    stats = engine.enable_stats()
+    stats.add_hook(records.append)
+
+    counters: Dict[str, int] = {}
+    for kind, text in inputs:
+        result = engine.search(text)
+        record = records.pop()
+        counter = counters[kind] = counters.get(kind, 0) + 1
+        yield {
+            "id": f"{kind}-{counter:05d}",
+            "kind": kind,
+            "input": text,
+            "path": result.path,
+            "expected": result.candidates,
+            "probes": {name: record[name] for name in PROBE_COUNTERS},
+        }
+    stats.hooks.remove(records.append)
+
+
+def write_workload(cases: List[Dict], header: Dict, output_path: str):
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for item in [header] + cases:
+            f.write(json.dumps(item, ensure_ascii=False, separators=(',', ':')))
+            f.write('\n')
+
+
+def load_workload(path: str) -> Tuple[Dict, List[Dict]]:
+    """(header, cases) of a workload file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        if header.get("format") != WORKLOAD_FORMAT:
+            raise ValueError(f"Not an engine workload file: {path}")
+        return header, [json.loads(line) for line in f if line.strip()]
+
+
+def generate(dictionary_path: str, ngram_path: str, cases: int, seed: int, output_path: str):
+    engine = ThaiPhoneticEngine.from_files(dictionary_path, ngram_path)
+    inputs = generate_inputs(sorted(engine.dictionary), cases, seed, engine)
+    print(f"Answering {len(inputs):,} inputs with the Python reference engine...")
+    start = time.perf_counter()
+    results = list(run_cases(engine, inputs))
+    seconds = time.perf_counter() - start
+
+    kinds: Dict[str, int] = {}
+    paths: Dict[str, int] = {}
+    for case in results:
+        kinds[case["kind"]] = kinds.get(case["kind"], 0) + 1
+        paths[case["path"]] = paths.get(case["path"], 0) + 1
+
+    header = {
+        "format": WORKLOAD_FORMAT,
+        "version": WORKLOAD_VERSION,
+        "seed": seed,
+        "dictionary_sha1": _file_sha1(dictionary_path),
+        "ngrams_sha1": _file_sha1(ngram_path) if ngram_path else None,
+        "cases": len(results),
+        "kinds": kinds,
+        "paths": paths,
+        "probe_counters": list(PROBE_COUNTERS),
+    }
+    write_workload(results, header, output_path)
+
+    print(f"Wrote {len(results):,} cases to {output_path} "
+          f"({os.path.getsize(output_path) / 1024:.0f} KB, answered in {seconds:.1f}s)")
+    print("  kinds: " + ", ".join(f"{kind} {n:,}" for kind, n in kinds.items()))
+    print("  paths: " + ", ".join(f"{path} {n:,}" for path, n in paths.items()))
+
+
+def verify(path: str, dictionary_path: str, ngram_path: str) -> int:
+    """Replay a workload; returns the number of mismatching cases."""
+    header, cases = load_workload(path)
+    if header["dictionary_sha1"] != _file_sha1(dictionary_path):
+        print(f"Warning: {dictionary_path} differs from the dictionary the workload was built from")
+
+    engine = ThaiPhoneticEngine.from_files(dictionary_path, ngram_path)
+    latencies: Dict[str, List[float]] = {}
+    mismatches = 0
+    for case in cases:
+        start = time.perf_counter()
+        result = engine.search(case["input"])
+        latencies.setdefault(case["kind"], []).append(time.perf_counter() - start)
+        if result.candidates != case["expected"] or result.path != case["path"]:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"  {case['id']} {case['input']!r}: expected {case['path']} "
+                      f"{case['expected'][:3]}, got {result.path} {result.candidates[:3]}")
+
+    print(f"\n{'kind':<13} {'cases':>6} {'p50 µs':>8} {'p95 µs':>8} {'max µs':>9}")
+    for kind, values in latencies.items():
+        values.sort()
+        p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+        print(f"{kind:<13} {len(values):>6} {statistics.median(values) * 1e6:8.0f} "
+              f"{p95 * 1e6:8.0f} {values[-1] * 1e6:9.0f}")
+    print(f"\n{mismatches} of {len(cases):,} cases differ")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate or replay the shared engine workload")
+    parser.add_argument("--dictionary", default=DEFAULT_DICTIONARY_PATH)
+    parser.add_argument("--ngrams", default=DEFAULT_NGRAM_PATH)
+    parser.add_argument("--cases", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_PATH)
+    parser.add_argument("--verify", metavar="WORKLOAD", help="Replay a workload file instead")
+    args = parser.parse_args()
+
+    if args.verify:
+        sys.exit(1 if verify(args.verify, args.dictionary, args.ngrams) else 0)
+    generate(args.dictionary, args.ngrams, args.cases, args.seed, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Context-conditioned reranking of single-word candidates.
+
+getCandidates returns exact and fuzzy hits in static frequency order; only
+multi-word segmentations are scored with n-grams. ContextReranker reorders
+a single-word candidate list using the previously committed word(s), with
+the same raw-count scoring as ThaiPhoneticEngine.score_phrase():
+- a candidate's score is the bigram count (previous word, candidate), or
+  0.01 if the bigram is unknown
+- with two context words, a known trigram multiplies it by count × 10
+- with a quantized scorer, the score is the negated word_cost() instead
+
+Candidates are stably sorted by score, so without context evidence the
+static order is kept ("ผม" + "gin" still gives กิน first), while ambiguous
+keys follow the context ("เวลา" + "nan" gives นาน before นั้น).
+
+Bigram and trigram counts are indexed by their context once at load time,
+so scoring a candidate is one dict lookup, and reranked lists are cached
+in a small LRU keyed by (context, key). The cache is locked, so one
+reranker can serve several threads, and a list computed while
+clear_cache() runs (e.g. during an overlay reload) is not cached.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Sequence, Tuple
+
+# Score of a candidate without bigram evidence (as in score_phrase)
+UNSEEN_BIGRAM_SCORE = 0.01
+# Trigram boost factor (as in score_phrase)
+TRIGRAM_BOOST = 10.0
+
+
+class ContextReranker:
+    """Reorders single-word candidates by the preceding words."""
+
+    def __init__(self, bigram_frequencies: Dict[str, int], trigram_frequencies: Dict[str, int] = None,
+                 scorer=None, cache_size: int = 256):
+        """
+        Args:
+            bigram_frequencies: "w1|w2" → count (ngram_frequencies.json)
+            trigram_frequencies: "w1|w2|w3" → count
+            scorer: Optional QuantizedNgramScorer; replaces raw-count scoring
+            cache_size: Reranked lists kept (least recently used evicted)
+        """
+        self.scorer = scorer
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[Tuple[str, ...], str], Tuple[str, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by clear_cache(); lists computed under an older generation are not cached
+        self._generation = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # previous word → {candidate: count}; "w1|w2" → {candidate: count}
+        self.successors: Dict[str, Dict[str, int]] = {}
+        for bigram, count in bigram_frequencies.items():
+            w1, _, w2 = bigram.partition('|')
+            self.successors.setdefault(w1, {})[w2] = count
+        self.trigram_successors: Dict[str, Dict[str, int]] = {}
+        for trigram, count in (trigram_frequencies or {}).items():
+            context, _, w3 = trigram.rpartition('|')
+            self.trigram_successors.setdefault(context, {})[w3] = count
+
+    @classmethod
+    def for_engine(cls, engine, cache_size: int = 256) -> "ContextReranker":
+        """Reranker over the n-gram data an engine was loaded with."""
+        return cls(engine.bigram_frequencies, engine.trigram_frequencies, engine.scorer, cache_size)
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+            self._generation += 1
+
+    def _scores(self, candidates: List[str], context: Tuple[str, ...]) -> List[float]:
+        prev = context[-1]
+        prev2 = context[-2] if len(context) >= 2 else None
+
+        if self.scorer is not None:
+            word_cost = self.scorer.word_cost
+            return [-word_cost(candidate, prev, prev2) for candidate in candidates]
+
+        successors = self.successors.get(prev, {})
+        trigram_successors = self.trigram_successors.get(f"{prev2}|{prev}", {}) if prev2 else {}
+        scores = []
+        for candidate in candidates:
+            score = successors.get(candidate, UNSEEN_BIGRAM_SCORE)
+            trigram_count = trigram_successors.get(candidate)
+            if trigram_count is not None:
+                score *= trigram_count * TRIGRAM_BOOST
+            scores.append(score)
+        return scores
+
+    def rerank(self, candidates: List[str], context: Sequence[str], key: str = None) -> List[str]:
+        """
+        Reorder `candidates` given the previously committed words.
+
+        Args:
+            candidates: Candidates in static order
+            context: Previously committed words, oldest first (the last two are used)
+            key: Input the candidates were looked up for; enables the cache
+
+        Returns:
+            Reordered candidates (the input list if there is no context)
+        """
+        if not context or len(candidates) < 2:
+            return candidates
+        context = tuple(context[-2:])
+
+        if key is not None:
+            cache_key = (context, key)
+            with self._lock:
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    self._cache.move_to_end(cache_key)
+                    self.cache_hits += 1
+                    return list(cached)
+                self.cache_misses += 1
+                generation = self._generation
+
+        scores = self._scores(candidates, context)
+        order = sorted(range(len(candidates)), key=lambda i: -scores[i])
+        reranked = [candidates[i] for i in order]
+
+        if key is not None:
+            with self._lock:
+                if generation == self._generation:
+                    self._cache[cache_key] = tuple(reranked)
+                    if len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        return reranked
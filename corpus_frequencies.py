@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Build word and n-gram frequencies from our own Thai text corpus.
+
+Replaces tnc_freq.txt (and the TNC n-gram counts) with counts from
+domain text. Input files are read in newline-aligned chunks of a few MB.
+The chunks are tokenized with PyThaiNLP over a process pool, and each
+worker returns partial NgramCounts that are merged as they arrive.
+N-grams do not cross line boundaries.
+
+Outputs:
+- a word\\tcount list in the tnc_freq.txt format (load_frequency_data())
+- ngram_frequencies.json (write_ngram_frequencies())
+- optionally ngram_model.json (build_backoff_model())
+
+Incremental updates: the merged counts are kept in a state file together
+with how many bytes of each input were consumed and a SHA-256 of those
+bytes. On the next run, unchanged files are skipped. Files that only
+grew are read from their previous end, and new files are read in full.
+A file whose already counted bytes changed cannot be un-counted, so it
+is reported and the run stops (use --rebuild). Appended text should
+start on a new line. Each file is read up to the size it had when the
+run started, so text appended during a run is left for the next one.
+
+Usage:
+    python corpus_frequencies.py corpus/*.txt --state corpus_counts.pickle [--workers 4]
+"""
+
+import hashlib
+import os
+import pickle
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from export_ngram_frequencies import build_backoff_model, write_ngram_frequencies
+
+# Bytes per work unit handed to a worker
+CHUNK_BYTES = 4 * 1024 * 1024
+
+STATE_VERSION = 1
+
+
+class NgramCounts:
+    """Unigram/bigram/trigram counters that can be merged."""
+
+    def __init__(self):
+        self.unigrams: Counter = Counter()
+        self.bigrams: Counter = Counter()
+        self.trigrams: Counter = Counter()
+        self.tokens = 0
+        self.bytes = 0
+
+    def add_tokens(self, tokens: List[str]):
+        """Count one line's tokens."""
+        self.tokens += len(tokens)
+        self.unigrams.update(tokens)
+        self.bigrams.update(zip(tokens, tokens[1:]))
+        self.trigrams.update(zip(tokens, tokens[1:], tokens[2:]))
+
+    def merge(self, other: "NgramCounts") -> "NgramCounts":
+        self.unigrams.update(other.unigrams)
+        self.bigrams.update(other.bigrams)
+        self.trigrams.update(other.trigrams)
+        self.tokens += other.tokens
+        self.bytes += other.bytes
+        return self
+
+
+_tokenizer = None
+
+
+def _tokenize(text: str, engine: str) -> List[str]:
+    """PyThaiNLP word_tokenize, imported once per worker process."""
+    global _tokenizer
+    if _tokenizer is None:
+        from pythainlp.tokenize import word_tokenize
+        _tokenizer = word_tokenize
+    return [token for token in _tokenizer(text, engine=engine, keep_whitespace=False) if token.strip()]
+
+
+def count_chunk(chunk: bytes, engine: str = "newmm") -> NgramCounts:
+    """Worker: tokenize and count one newline-aligned chunk of UTF-8 text."""
+    counts = NgramCounts()
+    counts.bytes = len(chunk)
+    for line in chunk.decode('utf-8', errors='replace').splitlines():
+        line = line.strip()
+        if line:
+            counts.add_tokens(_tokenize(line, engine))
+    return counts
+
+
+def iter_chunks(path: str, start: int = 0, end: int = None, chunk_bytes: int = CHUNK_BYTES,
+                digest=None) -> Iterator[bytes]:
+    """
+    Read bytes [start, end) of `path` in chunks that end on a newline (or at `end`).
+
+    Args:
+        path: Text file
+        start: First byte to read
+        end: Byte to stop at (None = EOF)
+        chunk_bytes: Approximate chunk size
+        digest: Optional hashlib object updated with exactly the bytes read
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = None if end is None else end - start
+        carry = b''
+        while remaining is None or remaining > 0:
+            block = f.read(chunk_bytes if remaining is None else min(chunk_bytes, remaining))
+            if not block:
+                break
+            if remaining is not None:
+                remaining -= len(block)
+            if digest is not None:
+                digest.update(block)
+            block = carry + block
+            cut = block.rfind(b'\n')
+            if cut < 0:
+                carry = block
+                continue
+            carry = block[cut + 1:]
+            yield block[:cut + 1]
+        if carry:
+            yield carry
+
+
+def _prefix_sha256(path: str, length: int):
+    """SHA-256 object fed with the first `length` bytes of `path`."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        remaining = length
+        while remaining > 0:
+            block = f.read(min(1 << 20, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest
+
+
+def load_state(path: Optional[str], engine: str) -> Dict:
+    """Previous run's counts and per-file progress (fresh state if none)."""
+    if path and os.path.exists(path):
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported state file version in {path}; rerun with --rebuild")
+        if state["engine"] != engine:
+            raise ValueError(f"{path} was built with the {state['engine']} tokenizer, not {engine}; "
+                             f"rerun with --rebuild")
+        return state
+    return {"version": STATE_VERSION, "engine": engine, "files": {}, "counts": NgramCounts()}
+
+
+def save_state(state: Dict, path: str):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def plan_updates(paths: List[str], files: Dict[str, Dict]) -> List[Tuple[str, int, int, object]]:
+    """
+    Decide what to read from each input file.
+
+    Args:
+        paths: Input text files
+        files: State entries: absolute path → {"bytes", "sha256"}
+
+    Returns:
+        (absolute path, start offset, end offset, SHA-256 object of the
+        bytes before start) for every file with new text; the end offset
+        is the file size now, and count_corpus() feeds the object the
+        bytes it reads, so it ends up covering exactly [0, end)
+
+    Raises:
+        ValueError: If already counted bytes of a file changed
+    """
+    plan = []
+    for path in dict.fromkeys(os.path.abspath(path) for path in paths):
+        size = os.path.getsize(path)
+        seen = files.get(path)
+        if seen is None:
+            plan.append((path, 0, size, hashlib.sha256()))
+            continue
+        digest = _prefix_sha256(path, seen["bytes"]) if size >= seen["bytes"] else None
+        if digest is None or digest.hexdigest() != seen["sha256"]:
+            raise ValueError(f"{path} changed since it was counted (not just appended to); "
+                             f"rerun with --rebuild")
+        if size > seen["bytes"]:
+            plan.append((path, seen["bytes"], size, digest))
+    return plan
+
+
+def count_corpus(plan: List[Tuple[str, int, int, object]], counts: NgramCounts, workers: int,
+                 engine: str = "newmm", chunk_bytes: int = CHUNK_BYTES) -> NgramCounts:
+    """
+    Count the planned byte ranges into `counts` over a process pool.
+
+    At most two chunks per worker are in flight, so memory stays bounded
+    no matter how large the inputs are.
+    """
+    chunks = (chunk for path, start, end, digest in plan
+              for chunk in iter_chunks(path, start, end, chunk_bytes, digest))
+    if workers <= 1:
+        for chunk in chunks:
+            counts.merge(count_chunk(chunk, engine))
+        return counts
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for chunk in chunks:
+            pending.add(pool.submit(count_chunk, chunk, engine))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    counts.merge(future.result())
+        for future in pending:
+            counts.merge(future.result())
+    return counts
+
+
+def write_frequency_list(unigrams: Counter, output_path: str, min_count: int = 1) -> int:
+    """Write word\\tcount lines, most frequent first (tnc_freq.txt format)."""
+    n = 0
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for word, count in unigrams.most_common():
+            if count < min_count:
+                break
+            if '\t' in word or '\n' in word:
+                continue
+            f.write(f"{word}\t{count}\n")
+            n += 1
+    return n
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build word/n-gram frequencies from a Thai text corpus")
+    parser.add_argument("inputs", nargs="+", help="UTF-8 Thai text files")
+    parser.add_argument("--state", default="/Users/fsonntag/Developer/thai-phon/corpus_counts.pickle",
+                        help="Counts and per-file progress kept between runs")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the state file and recount everything")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--engine", default="newmm", help="PyThaiNLP word_tokenize engine")
+    parser.add_argument("--freq-output", default="/Users/fsonntag/Developer/thai-phon/corpus_freq.txt")
+    parser.add_argument("--ngram-output",
+                        default="/Users/fsonntag/Developer/thai-phon/ThaiPhoneticIM/ngram_frequencies.json")
+    parser.add_argument("--model-output", default=None, help="Also write a quantized ngram_model.json")
+    parser.add_argument("--min-count", type=int, default=2, help="Drop rarer words from the frequency list")
+    parser.add_argument("--top-bigrams", type=int, default=50000)
+    parser.add_argument("--top-trigrams", type=int, default=10000)
+    args = parser.parse_args()
+
+    state = load_state(None if args.rebuild else args.state, args.engine)
+    counts: NgramCounts = state["counts"]
+    plan = plan_updates(args.inputs, state["files"])
+    new_bytes = sum(end - start for _, start, end, _ in plan)
+    print(f"{len(plan)} of {len(args.inputs)} files have new text ({new_bytes / (1024 * 1024):.1f} MB); "
+          f"{counts.tokens:,} tokens already counted")
+
+    if plan:
+        workers = max(1, args.workers)
+        print(f"Tokenizing with {workers} worker(s) ({args.engine})...")
+        tokens_before = counts.tokens
+        start = time.perf_counter()
+        count_corpus(plan, counts, workers, args.engine)
+        seconds = time.perf_counter() - start
+        mb_per_s = new_bytes / (1024 * 1024) / seconds if seconds > 0 else 0.0
+        print(f"  {counts.tokens - tokens_before:,} tokens in {seconds:.1f}s: "
+              f"{mb_per_s:.2f} MB/s, {mb_per_s / workers:.2f} MB/s per core")
+
+        for path, _, end, digest in plan:
+            state["files"][path] = {"bytes": end, "sha256": digest.hexdigest()}
+        save_state(state, args.state)
+        print(f"Saved counts to {args.state}")
+
+    n_words = write_frequency_list(counts.unigrams, args.freq_output, args.min_count)
+    print(f"Wrote {n_words:,} words to {args.freq_output}")
+
+    write_ngram_frequencies(counts.bigrams, counts.trigrams, args.ngram_output,
+                            args.top_bigrams, args.top_trigrams)
+
+    if args.model_output:
+        import json
+        model = build_backoff_model(counts.bigrams, counts.trigrams,
+                                    top_n_bigrams=args.top_bigrams, top_n_trigrams=args.top_trigrams)
+        with open(args.model_output, 'w', encoding='utf-8') as f:
+            json.dump(model, f, ensure_ascii=False, indent=None, separators=(',', ':'))
+        print(f"Wrote stupid-backoff model to {args.model_output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Opt-in instrumentation for the Python candidate engine.
+
+Attach an EngineStats to ThaiPhoneticEngine.stats to collect:
+- hot-path counters (fuzzy variants, dictionary probes, segmentation
+  prefix attempts, combinations scored, deadline-truncated results,
+  segmentation lengths skipped by the prefix filter)
+- which path answered each query (exact / fuzzy / segmented / none)
+- wall time per phase and per query
+- optional per-query trace hooks
+
+With engine.stats left at None the engine only pays for a few
+`is not None` checks per query. Each query counts into its own scratch
+dict; only folding it and the phase timings into the totals takes a lock,
+so a shared engine can be instrumented from several threads.
+"""
+
+import json
+import threading
+import time
+from typing import Callable, Dict, List
+
+# Counter names, in export order
+COUNTERS = (
+    "queries",
+    "fuzzy_variants",
+    "dictionary_probes",
+    "segment_prefix_attempts",
+    "combinations_scored",
+    "partial_results",
+    "prefix_filter_skips",
+)
+
+# Which branch of get_candidates produced the result
+PATHS = ("exact", "fuzzy", "segmented", "none")
+
+# Timed phases of get_candidates
+PHASES = ("exact", "fuzzy", "segment", "combine")
+
+# Upper bounds (seconds) of the query latency histogram
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+METRIC_PREFIX = "thai_phonetic"
+
+
+class EngineStats:
+    """Counters, per-phase timings and trace hooks for ThaiPhoneticEngine."""
+
+    def __init__(self):
+        self.hooks: List[Callable[[Dict], None]] = []
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Zero every counter and timer (hooks are kept)."""
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        self.counters = {name: 0 for name in COUNTERS}
+        self.paths = {path: 0 for path in PATHS}
+        self.phase_seconds = {phase: 0.0 for phase in PHASES}
+        self.phase_calls = {phase: 0 for phase in PHASES}
+        self.latency_buckets = [0] * len(LATENCY_BUCKETS)
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+
+    def add_hook(self, hook: Callable[[Dict], None]):
+        """
+        Register a callable that receives one trace record per query.
+
+        The record contains: input, path, seconds, candidates (count),
+        and the counters incremented by that query.
+        """
+        self.hooks.append(hook)
+
+    def begin_query(self) -> Dict[str, int]:
+        """Start a query and return its scratch counter dict."""
+        return {name: 0 for name in COUNTERS}
+
+    def add_phase(self, phase: str, start: float):
+        """Add the time elapsed since `start` (perf_counter) to a phase."""
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.phase_seconds[phase] += elapsed
+            self.phase_calls[phase] += 1
+
+    def end_query(self, query: Dict[str, int], text: str, path: str, seconds: float, n_candidates: int):
+        """Fold a finished query's scratch counters into the totals and fire hooks."""
+        query["queries"] = 1
+        with self._lock:
+            for name, value in query.items():
+                self.counters[name] += value
+            self.paths[path] += 1
+
+            self.latency_sum += seconds
+            if seconds > self.latency_max:
+                self.latency_max = seconds
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    self.latency_buckets[i] += 1
+                    break
+
+        if self.hooks:
+            record = {
+                "input": text,
+                "path": path,
+                "seconds": seconds,
+                "candidates": n_candidates,
+                **query,
+            }
+            for hook in self.hooks:
+                hook(record)
+
+    def to_dict(self) -> Dict:
+        """Snapshot of all counters and timings as plain data."""
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "paths": dict(self.paths),
+                "phases": {
+                    phase: {"seconds": self.phase_seconds[phase], "calls": self.phase_calls[phase]}
+                    for phase in PHASES
+                },
+                "latency": {
+                    "sum_seconds": self.latency_sum,
+                    "max_seconds": self.latency_max,
+                    "buckets": dict(zip((str(b) for b in LATENCY_BUCKETS), self.latency_buckets)),
+                },
+            }
+
+    def to_json(self) -> str:
+        """Export all counters and timings as a JSON string."""
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Export all counters and timings in the Prometheus text format."""
+        lines = []
+
+        for name in COUNTERS:
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {self.counters[name]}")
+
+        metric = f"{METRIC_PREFIX}_path_total"
+        lines.append(f"# HELP {metric} Queries answered by each candidate path")
+        lines.append(f"# TYPE {metric} counter")
+        for path in PATHS:
+            lines.append(f'{metric}{{path="{path}"}} {self.paths[path]}')
+
+        metric = f"{METRIC_PREFIX}_phase_seconds"
+        lines.append(f"# HELP {metric} Wall time spent in each get_candidates phase")
+        lines.append(f"# TYPE {metric} summary")
+        for phase in PHASES:
+            lines.append(f'{metric}_sum{{phase="{phase}"}} {self.phase_seconds[phase]:.9f}')
+            lines.append(f'{metric}_count{{phase="{phase}"}} {self.phase_calls[phase]}')
+
+        metric = f"{METRIC_PREFIX}_query_seconds"
+        lines.append(f"# HELP {metric} get_candidates latency")
+        lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.latency_buckets):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{le="+Inf"}} {self.counters["queries"]}')
+        lines.append(f"{metric}_sum {self.latency_sum:.9f}")
+        lines.append(f"{metric}_count {self.counters['queries']}")
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Evaluate ranking quality and throughput of the Python candidate engine.
+
+Test queries come from:
+- a fixed sample of thai2rom (Thai, romanization) pairs, typed both as RTGS
+  and as Paiboon
+- TNC sentences (one tokenized sentence per line, words separated by '|'
+  or whitespace), romanized word by word via thai2rom and concatenated
+
+Queries run through ThaiPhoneticEngine across a process pool. The JSON
+report contains top-1/top-3/top-9 accuracy, the no-result rate and queries
+per second, overall and broken down by source and by answering path
+(exact / fuzzy / segmented / none). Pass --compare to diff against the
+report of another build.
+
+The thai2rom sample is a regression sample, not a holdout: the dictionary
+is built from the same thai2rom data, so the sampled words are in it and
+the accuracy is in-sample. It measures how well the ranking puts a known
+word first, and catches regressions between builds; it does not measure
+how the engine handles words outside its dictionary. The sample is chosen
+by a hash of the Thai word, so it is the same on every run and build.
+
+Usage:
+    python evaluate_engine.py --thai2rom thai2rom/data.csv --sentences tnc_sentences.txt \\
+        --output eval_report.json [--compare previous_report.json]
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from export_dictionary_json import load_thai_romanization_data, rtgs_to_paiboon
+from thai_phonetic_engine import DEFAULT_DICTIONARY_PATH, DEFAULT_NGRAM_PATH, ThaiPhoneticEngine
+
+TOP_K = (1, 3, 9)
+
+# (source, romanized input, expected Thai)
+Query = Tuple[str, str, str]
+
+# Engine loaded once per worker process by _init_worker()
+_engine = None
+
+
+def in_sample(thai: str, sample_percent: float) -> bool:
+    """Deterministic sample: the same words are picked on every run and build."""
+    digest = hashlib.md5(thai.encode('utf-8')).digest()
+    return int.from_bytes(digest[:4], 'big') % 10000 < sample_percent * 100
+
+
+def thai2rom_queries(thai_to_roman: Dict[str, List[str]], sample_percent: float) -> List[Query]:
+    """One RTGS and one Paiboon query per sampled (Thai, romanization) pair."""
+    queries = []
+    for thai, romanizations in thai_to_roman.items():
+        if not in_sample(thai, sample_percent):
+            continue
+        for rtgs in romanizations:
+            rtgs = rtgs.lower().strip().replace(' ', '')
+            if not rtgs:
+                continue
+            queries.append(("thai2rom_rtgs", rtgs, thai))
+            paiboon = rtgs_to_paiboon(rtgs)
+            if paiboon != rtgs:
+                queries.append(("thai2rom_paiboon", paiboon, thai))
+    return queries
+
+
+def sentence_queries(sentences_path: str, thai_to_roman: Dict[str, List[str]],
+                     max_words: int, max_sentences: int) -> List[Query]:
+    """
+    Turn tokenized sentences into concatenated Paiboon input.
+
+    Long sentences are split into windows of at most `max_words` words;
+    windows with a word that has no romanization are skipped.
+    """
+    queries = []
+    with open(sentences_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            words = [w for w in line.strip().replace('|', ' ').split() if w]
+            for i in range(0, len(words), max_words):
+                window = words[i:i + max_words]
+                if len(window) < 2:
+                    continue
+                romans = []
+                for word in window:
+                    if word not in thai_to_roman:
+                        break
+                    romans.append(rtgs_to_paiboon(thai_to_roman[word][0].lower().strip().replace(' ', '')))
+                else:
+                    queries.append(("tnc_sentence", "".join(romans), "".join(window)))
+                    if len(queries) >= max_sentences:
+                        return queries
+    return queries
+
+
+def _init_worker(dictionary_path: str, ngram_path: str, model_path: str, ready=None):
+    """Load the worker's engine, then wait at the `ready` barrier (if given)."""
+    global _engine
+    try:
+        _engine = ThaiPhoneticEngine.from_files(dictionary_path, ngram_path, model_path)
+    except BaseException:
+        # Break the barrier so the other workers fail instead of waiting forever
+        if ready is not None:
+            ready.abort()
+        raise
+    if ready is not None:
+        ready.wait()
+
+
+def _evaluate_chunk(chunk: List[Query]) -> List[Tuple[str, str, int, float]]:
+    """Run a chunk of queries; returns (source, path, rank or -1, seconds) per query."""
+    results = []
+    for source, text, expected in chunk:
+        start = time.perf_counter()
+        result = _engine.search(text)
+        seconds = time.perf_counter() - start
+        try:
+            rank = result.candidates.index(expected)
+        except ValueError:
+            rank = -1
+        results.append((source, result.path, rank, seconds))
+    return results
+
+
+def _new_bucket() -> Dict:
+    return {"queries": 0, "no_result": 0, "seconds": 0.0, **{f"top{k}": 0 for k in TOP_K}}
+
+
+def _finish_bucket(bucket: Dict) -> Dict:
+    n = bucket["queries"]
+    report = {"queries": n}
+    for k in TOP_K:
+        report[f"top{k}_accuracy"] = bucket[f"top{k}"] / n if n else 0.0
+    report["no_result_rate"] = bucket["no_result"] / n if n else 0.0
+    report["mean_latency_ms"] = bucket["seconds"] / n * 1000 if n else 0.0
+    return report
+
+
+def evaluate(queries: List[Query], workers: int, chunk_size: int, dictionary_path: str,
+             ngram_path: str, model_path: str = None) -> Dict:
+    """
+    Evaluate queries over a process pool.
+
+    Args:
+        queries: (source, input, expected Thai) tuples
+        workers: Number of worker processes
+        chunk_size: Queries per task
+        dictionary_path: dictionary.json used by the workers
+        ngram_path: ngram_frequencies.json used by the workers
+        model_path: Optional quantized ngram_model.json
+
+    Returns:
+        JSON-serializable report
+    """
+    chunks = [queries[i:i + chunk_size] for i in range(0, len(queries), chunk_size)]
+    overall = _new_bucket()
+    by_source: Dict[str, Dict] = {}
+    by_path: Dict[str, Dict] = {}
+
+    # Workers wait here after loading, so no task runs until all are loaded
+    ready = multiprocessing.Barrier(workers)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(dictionary_path, ngram_path, model_path, ready)) as pool:
+        # One task per worker makes the pool start all of them; none can run
+        # before the barrier, so once they finish QPS excludes startup
+        list(pool.map(_evaluate_chunk, [[] for _ in range(workers)]))
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for results in pool.map(_evaluate_chunk, chunks):
+            for source, path, rank, seconds in results:
+                for bucket in (overall,
+                               by_source.setdefault(source, _new_bucket()),
+                               by_path.setdefault(path, _new_bucket())):
+                    bucket["queries"] += 1
+                    bucket["seconds"] += seconds
+                    if path == "none":
+                        bucket["no_result"] += 1
+                    for k in TOP_K:
+                        if 0 <= rank < k:
+                            bucket[f"top{k}"] += 1
+    wall_seconds = time.perf_counter() - start
+
+    return {
+        "config": {
+            "dictionary": dictionary_path,
+            "dictionary_sha1": _file_sha1(dictionary_path),
+            "ngrams": ngram_path,
+            "model": model_path,
+            "workers": workers,
+        },
+        "throughput": {
+            "queries": overall["queries"],
+            "wall_seconds": wall_seconds,
+            "engine_load_seconds": load_seconds,
+            "queries_per_second": overall["queries"] / wall_seconds if wall_seconds else 0.0,
+            "queries_per_second_per_worker": (overall["queries"] / overall["seconds"]
+                                              if overall["seconds"] else 0.0),
+        },
+        "overall": _finish_bucket(overall),
+        "by_source": {name: _finish_bucket(b) for name, b in sorted(by_source.items())},
+        "by_path": {name: _finish_bucket(b) for name, b in sorted(by_path.items())},
+    }
+
+
+def _file_sha1(path: str) -> str:
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+def print_report(report: Dict, baseline: Dict = None):
+    """Print a summary table, with deltas when a baseline report is given."""
+
+    def row(label: str, current: Dict, previous: Dict = None):
+        cells = [f"{label:<18}", f"{current['queries']:>8,}"]
+        for key in [f"top{k}_accuracy" for k in TOP_K] + ["no_result_rate"]:
+            cell = f"{current[key] * 100:6.2f}%"
+            if previous is not None and key in previous:
+                cell += f" ({(current[key] - previous[key]) * 100:+.2f})"
+            cells.append(f"{cell:>16}")
+        print(" ".join(cells))
+
+    header = ["", "queries"] + [f"top{k}" for k in TOP_K] + ["no result"]
+    print(f"{header[0]:<18} {header[1]:>8} " + " ".join(f"{h:>16}" for h in header[2:]))
+    row("overall", report["overall"], baseline and baseline.get("overall"))
+    for group in ("by_source", "by_path"):
+        for name, current in report[group].items():
+            previous = baseline and baseline.get(group, {}).get(name)
+            row(f"  {name}", current, previous)
+
+    qps = report["throughput"]["queries_per_second"]
+    line = f"\nThroughput: {qps:,.0f} queries/s ({report['config']['workers']} workers)"
+    if baseline:
+        previous_qps = baseline["throughput"]["queries_per_second"]
+        if previous_qps:
+            line += f" ({(qps / previous_qps - 1) * 100:+.1f}% vs baseline)"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate candidate ranking accuracy and throughput")
+    parser.add_argument("--thai2rom", required=True, help="thai2rom data.csv (Thai<TAB>Romanization)")
+    parser.add_argument("--sentences", help="Tokenized TNC sentences, one per line")
+    parser.add_argument("--dictionary", default=DEFAULT_DICTIONARY_PATH)
+    parser.add_argument("--ngrams", default=DEFAULT_NGRAM_PATH)
+    parser.add_argument("--model", default=None, help="Quantized ngram_model.json")
+    parser.add_argument("--sample-percent", type=float, default=5.0,
+                        help="Share of thai2rom words in the regression sample")
+    parser.add_argument("--max-sentence-words", type=int, default=4)
+    parser.add_argument("--max-sentences", type=int, default=20000)
+    parser.add_argument("--max-queries", type=int, default=None, help="Random sample size")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--output", default="eval_report.json")
+    parser.add_argument("--compare", help="Previous report to diff against")
+    args = parser.parse_args()
+
+    print("Loading Thai romanization data...")
+    thai_to_roman = load_thai_romanization_data(args.thai2rom)
+
+    queries = thai2rom_queries(thai_to_roman, args.sample_percent)
+    print(f"Sampled {len(queries):,} thai2rom queries ({args.sample_percent:g}% of words, in-sample)")
+    if args.sentences:
+        sentence_qs = sentence_queries(args.sentences, thai_to_roman, args.max_sentence_words, args.max_sentences)
+        print(f"Built {len(sentence_qs):,} sentence queries")
+        queries.extend(sentence_qs)
+
+    if args.max_queries and len(queries) > args.max_queries:
+        queries = random.Random(0).sample(queries, args.max_queries)
+
+    print(f"Evaluating {len(queries):,} queries on {args.workers} workers...")
+    report = evaluate(queries, args.workers, args.chunk_size, args.dictionary, args.ngrams, args.model)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Report written to {args.output}\n")
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+
+if __name__ == '__main__':
+    main()
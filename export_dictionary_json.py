@@ -6,21 +6,43 @@ Export Thai romanization dictionary to JSON for InputMethodKit
 - Filters to only common words (those in tnc_freq.txt) for smaller file size
 - Sorts candidates by frequency (most common words first)
 - NOTE: Vowel variants (sawasdee/sawatdee/sawadee) are now computed at runtime in Swift
+- Optional streaming build (--streaming) for romanization sources larger than RAM;
+  it writes pretty dictionary.json only, so it cannot be combined with the
+  options below that need the whole index in memory
+- Optional sharded output (--sharded) for lazy per-shard loading
+- Optional segmentation prefix filter (--prefix-filter): the exact canonical
+  key list, or a smaller but slower Bloom filter with --prefix-filter-bloom
+- Optional Thai → romanization reverse index (--reverse-index)
+- Optional cold tier (--tiered): candidates past the top 9 in a sorted,
+  memory-mappable dictionary_cold.tsv (see tiered_dictionary.py)
+- Optional doubled-syllable entries for frequent reduplicated words (--reduplication)
+- Output format (--format=pretty|minified|jsonl): indent=2 JSON (default),
+  key-sorted minified JSON, or one ["key", [words]] JSON array per line
 """
 
 import json
 import csv
+import heapq
+import os
 import re
-from typing import Dict, List, Set
+import tempfile
+from itertools import groupby
+from typing import Dict, Iterator, List, Set, Tuple
 
+from prefix_filter import export_prefix_filter, export_prefix_keys
+from sharded_dictionary import MANIFEST_NAME, shard_filename, shard_prefix
+from tiered_dictionary import export_cold_tier
 
-def load_thai_romanization_data(csv_path: str, max_entries: int = None) -> Dict[str, List[str]]:
+
+def load_thai_romanization_data(csv_path: str, max_entries: int = None,
+                                only_words: Set[str] = None) -> Dict[str, List[str]]:
     """
     Load Thai to romanization mappings from CSV file.
 
     Args:
         csv_path: Path to CSV file with format: Thai<TAB>Romanization
         max_entries: Maximum number of entries to load (None = all)
+        only_words: Load only these Thai words (None = all)
 
     Returns:
         Dictionary mapping Thai words to list of romanizations
@@ -39,6 +61,8 @@ def load_thai_romanization_data(csv_path: str, max_entries: int = None) -> Dict[
                 # Skip empty entries
                 if not thai or not roman:
                     continue
+                if only_words is not None and thai not in only_words:
+                    continue
 
                 # Store original RTGS romanization
                 if thai not in thai_to_roman:
@@ -172,6 +196,61 @@ def generate_vowel_variants(roman: str) -> List[str]:
     return list(variants)
 
 
+def romanization_keys(rtgs_roman: str, has_yamok: bool) -> List[str]:
+    """
+    Dictionary keys produced by one normalized RTGS romanization.
+
+    Shared by the forward index and the reverse index, so both always
+    agree on which keys bring up a word.
+
+    Args:
+        rtgs_roman: Lowercased, stripped RTGS romanization
+        has_yamok: Whether the Thai word contains ๆ
+
+    Returns:
+        Distinct keys in a fixed order: RTGS, Paiboon, then the space-less
+        RTGS and Paiboon forms for yamok entries
+    """
+    # Collect variants for this romanization (a dict keeps them ordered and distinct)
+    all_variants: Dict[str, None] = {}
+
+    # 1. Add original RTGS
+    all_variants[rtgs_roman] = None
+
+    # 2. Add Paiboon variant
+    paiboon = rtgs_to_paiboon(rtgs_roman)
+    all_variants[paiboon] = None
+
+    # 3. SPECIAL: For yamok entries with spaces (e.g., "khoi khoi" from "ค่อย ๆ")
+    #    Also add concatenated version without space (e.g., "khoikhoi")
+    #    This allows users to type "khoikhoi" instead of "khoi khoi"
+    if has_yamok and ' ' in rtgs_roman:
+        rtgs_no_space = rtgs_roman.replace(' ', '')
+        all_variants[rtgs_no_space] = None
+        # Also add Paiboon version without space
+        paiboon_no_space = rtgs_to_paiboon(rtgs_no_space)
+        all_variants[paiboon_no_space] = None
+
+    # NOTE: Vowel variants are now generated at runtime in Swift for performance
+    # See vowel_variants_backup.py for the original logic
+
+    return list(all_variants)
+
+
+def doubled_yamok_keys(rtgs: str) -> List[str]:
+    """
+    Doubled-syllable keys for a yamok word (e.g., "su" → "susu").
+
+    Args:
+        rtgs: Lowercased, stripped RTGS romanization of the single syllable
+
+    Returns:
+        [doubled RTGS, doubled Paiboon]
+    """
+    paiboon = rtgs_to_paiboon(rtgs)
+    return [rtgs + rtgs, paiboon + paiboon]
+
+
 def create_inverted_index(thai_to_roman: Dict[str, List[str]], freq_map: Dict[str, int], yamok_map: Dict[str, str]) -> Dict[str, List[str]]:
     """
     Create inverted index from romanization to Thai words.
@@ -206,31 +285,8 @@ def create_inverted_index(thai_to_roman: Dict[str, List[str]], freq_map: Dict[st
             if not rtgs_roman:
                 continue
 
-            # Collect variants for this romanization
-            all_variants: Set[str] = set()
-
-            # 1. Add original RTGS
-            all_variants.add(rtgs_roman)
-
-            # 2. Add Paiboon variant
-            paiboon = rtgs_to_paiboon(rtgs_roman)
-            all_variants.add(paiboon)
-
-            # 3. SPECIAL: For yamok entries with spaces (e.g., "khoi khoi" from "ค่อย ๆ")
-            #    Also add concatenated version without space (e.g., "khoikhoi")
-            #    This allows users to type "khoikhoi" instead of "khoi khoi"
-            if has_yamok and ' ' in rtgs_roman:
-                rtgs_no_space = rtgs_roman.replace(' ', '')
-                all_variants.add(rtgs_no_space)
-                # Also add Paiboon version without space
-                paiboon_no_space = rtgs_to_paiboon(rtgs_no_space)
-                all_variants.add(paiboon_no_space)
-
-            # NOTE: Vowel variants are now generated at runtime in Swift for performance
-            # See vowel_variants_backup.py for the original logic
-
-            # 4. Add to inverted index
-            for variant in all_variants:
+            # Add every key for this romanization to the inverted index
+            for variant in romanization_keys(rtgs_roman, has_yamok):
                 if variant not in roman_to_thai:
                     roman_to_thai[variant] = []
                 if thai_word not in roman_to_thai[variant]:
@@ -245,18 +301,11 @@ def create_inverted_index(thai_to_roman: Dict[str, List[str]], freq_map: Dict[st
         if not rtgs:
             continue
 
-        # Convert to Paiboon
-        paiboon = rtgs_to_paiboon(rtgs)
-
-        # Generate doubled syllable (e.g., "su" → "susu", "gin" → "gingin")
-        doubled_rtgs = rtgs + rtgs
-        doubled_paiboon = paiboon + paiboon
-
         # Create Thai word with ๆ (e.g., สู้ → สู้ๆ)
         thai_with_yamok = thai_word + 'ๆ'
 
-        # Add doubled syllable entries
-        for doubled in [doubled_rtgs, doubled_paiboon]:
+        # Add doubled syllable entries (e.g., "su" → "susu", "gin" → "gingin")
+        for doubled in doubled_yamok_keys(rtgs):
             if doubled not in roman_to_thai:
                 roman_to_thai[doubled] = []
             if thai_with_yamok not in roman_to_thai[doubled]:
@@ -268,6 +317,134 @@ def create_inverted_index(thai_to_roman: Dict[str, List[str]], freq_map: Dict[st
     return roman_to_thai
 
 
+def rank_candidates(roman_to_thai: Dict[str, List[str]], freq_map: Dict[str, int],
+                    max_candidates: int = 9) -> Dict[str, List[str]]:
+    """
+    Sort and truncate the candidates of every key.
+
+    Sort order: 1) frequency (most common first), 2) length (shorter first),
+    3) alphabetical as tiebreaker.
+
+    Args:
+        roman_to_thai: Dictionary mapping romanizations to Thai words
+        freq_map: Dictionary mapping Thai words to frequency counts
+        max_candidates: Candidates kept per key (9 for number key selection 1-9)
+
+    Returns:
+        Dictionary mapping romanizations to ranked Thai words
+    """
+    dictionary = {}
+    for roman, thai_words in roman_to_thai.items():
+        sorted_words = sorted(
+            thai_words,
+            key=lambda word: (
+                -freq_map.get(word, 0),  # Negative for descending (most frequent first)
+                len(word),                # Shorter words first
+                word                      # Alphabetically as tiebreaker
+            )
+        )
+        dictionary[roman] = sorted_words[:max_candidates]
+    return dictionary
+
+
+def create_reverse_index(thai_to_roman: Dict[str, List[str]], dictionary: Dict[str, List[str]],
+                         yamok_map: Dict[str, str]) -> Dict[str, List[str]]:
+    """
+    Create the reverse index from Thai words to the romanizations that produce them.
+
+    Only keys under which the word survived ranking are kept, so every
+    romanization listed actually brings up the word. They are ranked by the
+    word's position in that key's candidates (1st candidate first), then by
+    thai2rom order with RTGS before Paiboon. Keys come from
+    romanization_keys() and doubled_yamok_keys(), as in the forward index.
+
+    Args:
+        thai_to_roman: Dictionary mapping Thai words to RTGS romanizations
+        dictionary: Ranked dictionary from rank_candidates()
+        yamok_map: Dictionary mapping Thai words to RTGS romanizations for yamok words
+
+    Returns:
+        Dictionary mapping Thai words to ranked romanizations
+    """
+    def collect(thai_word: str, keys: List[str], ranked: Dict[str, tuple]):
+        for key in keys:
+            candidates = dictionary.get(key)
+            if key not in ranked and candidates and thai_word in candidates:
+                ranked[key] = (candidates.index(thai_word), len(ranked))
+
+    reverse: Dict[str, Dict[str, tuple]] = {}
+    for thai_word, romanizations in thai_to_roman.items():
+        ranked = {}
+        has_yamok = 'ๆ' in thai_word
+        for rtgs_roman in romanizations:
+            rtgs_roman = rtgs_roman.lower().strip()
+            if not rtgs_roman:
+                continue
+            collect(thai_word, romanization_keys(rtgs_roman, has_yamok), ranked)
+        if ranked:
+            reverse[thai_word] = ranked
+
+    for thai_word, rtgs in yamok_map.items():
+        rtgs = rtgs.lower().strip()
+        if rtgs:
+            thai_with_yamok = thai_word + 'ๆ'
+            collect(thai_with_yamok, doubled_yamok_keys(rtgs), reverse.setdefault(thai_with_yamok, {}))
+
+    return {
+        thai_word: sorted(ranked, key=ranked.get)
+        for thai_word, ranked in reverse.items() if ranked
+    }
+
+
+def export_reverse_index(reverse: Dict[str, List[str]], output_path: str):
+    """
+    Write the reverse index in its compact form: {"thai": "roman1|roman2|..."}.
+
+    Args:
+        reverse: Output of create_reverse_index()
+        output_path: Where to write the JSON file
+    """
+    compact = {thai_word: "|".join(romanizations) for thai_word, romanizations in sorted(reverse.items())}
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(compact, f, ensure_ascii=False, separators=(',', ':'))
+
+
+OUTPUT_FORMATS = ("pretty", "minified", "jsonl")
+
+
+def write_dictionary(dictionary: Dict[str, List[str]], output_path: str, output_format: str = "pretty"):
+    """
+    Write the dictionary in one of OUTPUT_FORMATS.
+
+    - pretty: json.dump with indent=2, keys in build order (what the runtimes ship)
+    - minified: no whitespace, keys sorted
+    - jsonl: one ["key", [words]] array per line, keys sorted
+
+    Args:
+        dictionary: Dictionary mapping romanizations to ranked Thai words
+        output_path: Where to write the file
+        output_format: One of OUTPUT_FORMATS
+    """
+    with open(output_path, 'w', encoding='utf-8') as f:
+        if output_format == "pretty":
+            json.dump(dictionary, f, ensure_ascii=False, indent=2)
+        elif output_format == "minified":
+            json.dump(dictionary, f, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+        elif output_format == "jsonl":
+            for key in sorted(dictionary):
+                f.write(json.dumps([key, dictionary[key]], ensure_ascii=False, separators=(',', ':')))
+                f.write('\n')
+        else:
+            raise ValueError(f"Unknown output format: {output_format}")
+
+
+def load_dictionary_jsonl(path: str) -> Dict[str, List[str]]:
+    """Load a dictionary written with output_format="jsonl"."""
+    loads = json.loads
+    with open(path, 'r', encoding='utf-8') as f:
+        return dict(loads(line) for line in f if line.strip())
+
+
 def load_frequency_data(freq_path):
     """Load Thai word frequency data from tnc_freq.txt."""
     print(f"Loading frequency data from {freq_path}...")
@@ -317,14 +494,308 @@ def load_yamok_words(csv_path: str) -> Dict[str, str]:
     print(f"Loaded {len(yamok_map)} yamok words for doubled syllable generation")
     return yamok_map
 
-def main():
+
+_VOWEL_RUN = re.compile(r'[aeiou]+')
+
+
+def is_monosyllabic(rtgs: str) -> bool:
+    """One RTGS vowel group and no space (e.g. "su", "khoi", "rueang"; not "sawatdi")."""
+    return ' ' not in rtgs and len(_VOWEL_RUN.findall(rtgs)) == 1
+
+
+# A word made only of Thai consonants, vowels and tone marks: excludes
+# sentence markers (<s/>), ๆ, ฯ, ฿, Thai digits and anything non-Thai
+THAI_WORD_PATTERN = re.compile(r'[\u0E01-\u0E2E\u0E30-\u0E3A\u0E40-\u0E45\u0E47-\u0E4E]+')
+
+
+def reduplication_counts(bigram_freqs: Dict[str, int]) -> Dict[str, int]:
+    """
+    Corpus evidence for reduplication from TNC bigrams ("w1|w2" keys).
+
+    Counts both the written form with mai yamok (ดี|ๆ) and the spelled-out
+    repetition (ดี|ดี). Only tokens matching THAI_WORD_PATTERN are counted,
+    so sentinels, punctuation and digits never become candidates.
+
+    Returns:
+        Dictionary mapping Thai words to their self-pair count
+    """
+    counts: Dict[str, int] = {}
+    for bigram, freq in bigram_freqs.items():
+        w1, _, w2 = bigram.partition('|')
+        if (w2 == 'ๆ' or w1 == w2) and THAI_WORD_PATTERN.fullmatch(w1):
+            counts[w1] = counts.get(w1, 0) + freq
+    return counts
+
+
+def select_reduplication_words(thai_to_roman: Dict[str, List[str]], freq_map: Dict[str, int],
+                               bigram_freqs: Dict[str, int], yamok_map: Dict[str, str],
+                               top_n: int = 200) -> Dict[str, str]:
+    """
+    Pick monosyllabic words to get doubled-syllable entries beyond yamok_words.csv.
+
+    Candidates are words with TNC bigram self-pairs that are in the frequency
+    data and have a monosyllabic romanization; they are ranked by self-pair
+    count, then by word frequency. Curated yamok words are skipped.
+
+    Args:
+        thai_to_roman: Dictionary mapping Thai words to RTGS romanizations
+        freq_map: Dictionary mapping Thai words to frequency counts
+        bigram_freqs: TNC bigram counts ("w1|w2" keys, as in ngram_frequencies.json)
+        yamok_map: Curated yamok words (already covered)
+        top_n: Size cap on the number of words selected (each adds two keys)
+
+    Returns:
+        Dictionary mapping Thai words to RTGS romanization, in the format of
+        load_yamok_words() so it can be merged into yamok_map
+    """
+    counts = reduplication_counts(bigram_freqs)
+    ranked = sorted(counts, key=lambda word: (-counts[word], -freq_map.get(word, 0), word))
+
+    selected: Dict[str, str] = {}
+    for thai_word in ranked:
+        if len(selected) >= top_n:
+            break
+        if thai_word in yamok_map or thai_word not in freq_map:
+            continue
+        for rtgs in thai_to_roman.get(thai_word, []):
+            rtgs = rtgs.lower().strip()
+            if is_monosyllabic(rtgs):
+                selected[thai_word] = rtgs
+                break
+    return selected
+
+
+# (key, -frequency, len(thai), thai): sorting these tuples gives the same
+# candidate order as the in-memory ranking in main()
+IndexRecord = Tuple[str, int, int, str]
+
+
+def iter_index_records(csv_path: str, freq_map: Dict[str, int], yamok_map: Dict[str, str]) -> Iterator[IndexRecord]:
+    """
+    Stream (key, thai) index records straight from the romanization CSV.
+
+    Applies the same filters and key generation as create_inverted_index(),
+    one row at a time, without grouping rows by Thai word.
+
+    Args:
+        csv_path: Path to CSV file with format: Thai<TAB>Romanization
+        freq_map: Dictionary mapping Thai words to frequency counts
+        yamok_map: Dictionary mapping Thai words to RTGS romanizations for yamok words
+
+    Yields:
+        IndexRecord tuples (duplicates are removed during the merge)
+    """
+    with open(csv_path, 'r', encoding='utf-8-sig') as f:
+        reader = csv.reader(f, delimiter='\t')
+        for row in reader:
+            if len(row) < 2:
+                continue
+            thai_word, rtgs_roman = row[0].strip(), row[1].strip()
+            if not thai_word or not rtgs_roman:
+                continue
+
+            has_yamok = 'ๆ' in thai_word
+            if not has_yamok and thai_word not in freq_map:
+                continue
+
+            rtgs_roman = rtgs_roman.lower().strip()
+            if not rtgs_roman:
+                continue
+
+            freq = freq_map.get(thai_word, 0)
+            for variant in romanization_keys(rtgs_roman, has_yamok):
+                yield (variant, -freq, len(thai_word), thai_word)
+
+    # Doubled syllable entries for curated yamok words
+    for thai_word, rtgs in yamok_map.items():
+        rtgs = rtgs.lower().strip()
+        if not rtgs:
+            continue
+        thai_with_yamok = thai_word + 'ๆ'
+        freq = freq_map.get(thai_with_yamok, 0)
+        for doubled in doubled_yamok_keys(rtgs):
+            yield (doubled, -freq, len(thai_with_yamok), thai_with_yamok)
+
+
+def _write_spill(records: List[IndexRecord], tmp_dir: str) -> str:
+    """Sort records and write them to a TSV spill file; returns its path."""
+    records.sort()
+    fd, path = tempfile.mkstemp(prefix='index-', suffix='.tsv', dir=tmp_dir)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        for key, neg_freq, _, thai in records:
+            f.write(f"{key}\t{neg_freq}\t{thai}\n")
+    return path
+
+
+def _read_spill(path: str) -> Iterator[IndexRecord]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            key, neg_freq, thai = line.rstrip('\n').split('\t')
+            yield (key, int(neg_freq), len(thai), thai)
+
+
+def _merge_spills(paths: List[str], tmp_dir: str, max_open_files: int) -> Iterator[IndexRecord]:
+    """
+    K-way merge of sorted spill files.
+
+    If there are more than `max_open_files` spills, groups are merged into
+    intermediate spill files first so the number of open files stays bounded.
+    """
+    while len(paths) > max_open_files:
+        merged_paths = []
+        for i in range(0, len(paths), max_open_files):
+            group = paths[i:i + max_open_files]
+            fd, merged = tempfile.mkstemp(prefix='merge-', suffix='.tsv', dir=tmp_dir)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                for key, neg_freq, _, thai in heapq.merge(*(_read_spill(p) for p in group)):
+                    f.write(f"{key}\t{neg_freq}\t{thai}\n")
+            for p in group:
+                os.remove(p)
+            merged_paths.append(merged)
+        paths = merged_paths
+
+    yield from heapq.merge(*(_read_spill(p) for p in paths))
+
+
+def export_dictionary_external(csv_path: str, freq_map: Dict[str, int], yamok_map: Dict[str, str],
+                               output_path: str, max_candidates: int = 9, chunk_records: int = 1000000,
+                               tmp_dir: str = None, max_open_files: int = 64) -> Tuple[int, int]:
+    """
+    Build dictionary.json with bounded memory (external sort).
+
+    Rows are read from the CSV in a stream; every chunk of `chunk_records`
+    (key, -freq, len, thai) records is sorted and spilled to a temporary
+    file. The spill files are k-way merged, grouped by key, de-duplicated
+    and truncated to the top `max_candidates`, and written to JSON as they
+    are merged. Peak memory depends on chunk_records, freq_map and
+    yamok_map, not on the size of the CSV.
+
+    The result is equal (as a mapping) to the in-memory build, but keys are
+    written in sorted order instead of first-seen order.
+
+    Args:
+        csv_path: Path to CSV file with format: Thai<TAB>Romanization
+        freq_map: Dictionary mapping Thai words to frequency counts
+        yamok_map: Dictionary mapping Thai words to RTGS romanizations for yamok words
+        output_path: Where to write dictionary.json
+        max_candidates: Candidates kept per key
+        chunk_records: Records per sorted spill file
+        tmp_dir: Directory for spill files (default: system temp dir)
+        max_open_files: Merge fan-in limit
+
+    Returns:
+        (number of keys, number of Thai words written)
+    """
+    with tempfile.TemporaryDirectory(prefix='thai-index-', dir=tmp_dir) as spill_dir:
+        spill_paths = []
+        buffer: List[IndexRecord] = []
+        for record in iter_index_records(csv_path, freq_map, yamok_map):
+            buffer.append(record)
+            if len(buffer) >= chunk_records:
+                spill_paths.append(_write_spill(buffer, spill_dir))
+                buffer = []
+        if buffer:
+            spill_paths.append(_write_spill(buffer, spill_dir))
+        buffer = []
+        print(f"Wrote {len(spill_paths)} sorted spill files, merging...")
+
+        n_keys = 0
+        n_words = 0
+        # Same layout as json.dump(..., ensure_ascii=False, indent=2)
+        with open(output_path, 'w', encoding='utf-8') as out:
+            out.write('{')
+            merged = _merge_spills(spill_paths, spill_dir, max_open_files)
+            for key, records in groupby(merged, key=lambda r: r[0]):
+                words = []
+                previous = None
+                for _, _, _, thai in records:
+                    if thai != previous and len(words) < max_candidates:
+                        words.append(thai)
+                    previous = thai
+
+                out.write(',\n  ' if n_keys else '\n  ')
+                out.write(json.dumps(key, ensure_ascii=False))
+                out.write(': [\n    ')
+                out.write(',\n    '.join(json.dumps(w, ensure_ascii=False) for w in words))
+                out.write('\n  ]')
+                n_keys += 1
+                n_words += len(words)
+            out.write('\n}' if n_keys else '}')
+
+    return n_keys, n_words
+
+
+def export_sharded_dictionary(dictionary: Dict[str, List[str]], output_dir: str, prefix_length: int = 2) -> Dict:
+    """
+    Split a dictionary into per-prefix shard files plus a manifest.
+
+    Keys are partitioned by their first `prefix_length` characters. Shards
+    are written minified; the manifest records each shard's file, key count
+    and byte size (see sharded_dictionary.py for the loader).
+
+    Args:
+        dictionary: Mapping romanization → ranked Thai words
+        output_dir: Directory for manifest.json and shard files
+        prefix_length: Number of leading key characters that select a shard
+
+    Returns:
+        The manifest dictionary
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    partitions: Dict[str, Dict[str, List[str]]] = {}
+    for roman, thai_words in dictionary.items():
+        partitions.setdefault(shard_prefix(roman, prefix_length), {})[roman] = thai_words
+
+    shards = {}
+    for prefix in sorted(partitions):
+        filename = shard_filename(prefix)
+        data = json.dumps(partitions[prefix], ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        with open(os.path.join(output_dir, filename), 'wb') as f:
+            f.write(data)
+        shards[prefix] = {"file": filename, "keys": len(partitions[prefix]), "bytes": len(data)}
+
+    manifest = {
+        "format": "sharded-dictionary",
+        "prefix_length": prefix_length,
+        "total_keys": len(dictionary),
+        "shards": shards,
+    }
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    return manifest
+
+
+def streaming_conflicts(sharded: bool = False, prefix_filter: bool = False, reverse_index: bool = False,
+                        tiered: bool = False, output_format: str = "pretty",
+                        prefix_filter_bloom: bool = False) -> List[str]:
+    """Command-line options that the streaming build cannot honour."""
+    conflicts = [option for option, enabled in (("--sharded", sharded), ("--prefix-filter", prefix_filter),
+                                                ("--prefix-filter-bloom", prefix_filter_bloom),
+                                                ("--reverse-index", reverse_index), ("--tiered", tiered))
+                 if enabled]
+    if output_format != "pretty":
+        conflicts.append(f"--format={output_format}")
+    return conflicts
+
+
+def main(streaming: bool = False, sharded: bool = False, prefix_filter: bool = False,
+         reverse_index: bool = False, reduplication: bool = False, output_format: str = "pretty",
+         tiered: bool = False, reduplication_top_n: int = 200, prefix_filter_bloom: bool = False):
     csv_path = "/Users/fsonntag/Developer/thai-phon/thai2rom/data.csv"
     freq_path = "/Users/fsonntag/Developer/thai-phon/tnc_freq.txt"
     yamok_path = "/Users/fsonntag/Developer/thai-phon/yamok_words.csv"
     output_path = "/Users/fsonntag/Developer/thai-phon/ThaiPhoneticIM/dictionary.json"
+    ngram_path = "/Users/fsonntag/Developer/thai-phon/ThaiPhoneticIM/ngram_frequencies.json"
 
-    print("Loading Thai romanization data...")
-    thai_to_roman = load_thai_romanization_data(csv_path, max_entries=None)
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}")
+    if streaming:
+        conflicts = streaming_conflicts(sharded, prefix_filter, reverse_index, tiered, output_format,
+                                        prefix_filter_bloom)
+        if conflicts:
+            raise ValueError(f"--streaming cannot be combined with {', '.join(conflicts)}")
 
     print("Loading frequency data...")
     freq_map = load_frequency_data(freq_path)
@@ -332,31 +803,75 @@ def main():
     print("Loading yamok words...")
     yamok_map = load_yamok_words(yamok_path)
 
+    if reduplication:
+        print("Selecting reduplicated words from TNC bigram self-pairs...")
+        with open(ngram_path, 'r', encoding='utf-8') as f:
+            bigram_freqs = json.load(f)["bigrams"]
+        # Only words with self-pairs are candidates, so the streaming build
+        # does not need the whole CSV in memory for this
+        candidates = set(reduplication_counts(bigram_freqs))
+        candidate_roman = load_thai_romanization_data(csv_path, only_words=candidates)
+        extra = select_reduplication_words(candidate_roman, freq_map, bigram_freqs, yamok_map, top_n=reduplication_top_n)
+        print(f"Adding doubled syllable entries for {len(extra)} more words "
+              f"(e.g. {', '.join(w + 'ๆ' for w in list(extra)[:5])})")
+        yamok_map = {**yamok_map, **extra}
+
+    if streaming:
+        print("Building index with external sort (streaming mode)...")
+        n_keys, n_words = export_dictionary_external(csv_path, freq_map, yamok_map, output_path)
+        print(f"Dictionary exported to {output_path}")
+        print(f"Total romanizations: {n_keys}")
+        print(f"Total Thai words: {n_words}")
+        return
+
+    print("Loading Thai romanization data...")
+    thai_to_roman = load_thai_romanization_data(csv_path, max_entries=None)
+
     print("Creating inverted index (filtered by frequency)...")
     roman_to_thai = create_inverted_index(thai_to_roman, freq_map, yamok_map)
 
     # Sort candidates by: 1) frequency (most common first), 2) length (shorter first)
-    dictionary = {}
-    for roman, thai_words in roman_to_thai.items():
-        sorted_words = sorted(
-            thai_words,
-            key=lambda word: (
-                -freq_map.get(word, 0),  # Negative for descending (most frequent first)
-                len(word),                # Shorter words first
-                word                      # Alphabetically as tiebreaker
-            )
-        )
-        # Limit to 9 candidates (for number key selection 1-9)
-        dictionary[roman] = sorted_words[:9]
+    # Limit to 9 candidates (for number key selection 1-9)
+    dictionary = rank_candidates(roman_to_thai, freq_map, max_candidates=9)
 
-    print(f"Exporting {len(dictionary)} entries to JSON...")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(dictionary, f, ensure_ascii=False, indent=2)
+    if output_format == "jsonl":
+        output_path = os.path.splitext(output_path)[0] + ".jsonl"
+    print(f"Exporting {len(dictionary)} entries to JSON ({output_format})...")
+    write_dictionary(dictionary, output_path, output_format)
 
     print(f"Dictionary exported to {output_path}")
     print(f"Total romanizations: {len(dictionary)}")
     print(f"Total Thai words: {sum(len(v) for v in dictionary.values())}")
 
+    if sharded:
+        shard_dir = os.path.join(os.path.dirname(output_path), "dictionary_shards")
+        manifest = export_sharded_dictionary(dictionary, shard_dir)
+        print(f"Sharded dictionary exported to {shard_dir} ({len(manifest['shards'])} shards)")
+
+    if prefix_filter_bloom:
+        filter_path = os.path.join(os.path.dirname(output_path), "prefix_filter.bloom")
+        bloom = export_prefix_filter(dictionary.keys(), filter_path, fp_rate=0.01)
+        print(f"Prefix Bloom filter exported to {filter_path} ({bloom.n_bits // 8:,} bytes)")
+    elif prefix_filter:
+        filter_path = os.path.join(os.path.dirname(output_path), "prefix_filter.txt")
+        count = export_prefix_keys(dictionary.keys(), filter_path)
+        print(f"Prefix filter exported to {filter_path} ({count:,} canonical keys)")
+
+    if tiered:
+        cold_path = os.path.join(os.path.dirname(output_path), "dictionary_cold.tsv")
+        longest = max(map(len, roman_to_thai.values()), default=0)
+        full = rank_candidates(roman_to_thai, freq_map, max_candidates=longest)
+        n_cold = export_cold_tier(full, cold_path, hot_candidates=9)
+        print(f"Cold tier exported to {cold_path} ({n_cold:,} keys, "
+              f"{sum(len(v) for v in full.values()) - sum(len(v) for v in dictionary.values()):,} more candidates, "
+              f"{os.path.getsize(cold_path) / 1024:.0f} KB)")
+
+    if reverse_index:
+        reverse_path = os.path.join(os.path.dirname(output_path), "reverse_index.json")
+        reverse = create_reverse_index(thai_to_roman, dictionary, yamok_map)
+        export_reverse_index(reverse, reverse_path)
+        print(f"Reverse index exported to {reverse_path} ({len(reverse):,} Thai words)")
+
     # Show examples with frequency info
     print("\nExamples (sorted by frequency):")
     test_words = [
@@ -392,4 +907,26 @@ def main():
             print(f"\n  ✗ {word} → NOT FOUND in dictionary")
 
 if __name__ == '__main__':
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export the romanization dictionary for the keyboards")
+    parser.add_argument("--streaming", action="store_true", help="External-sort build with bounded memory")
+    parser.add_argument("--sharded", action="store_true", help="Also write per-prefix shards")
+    parser.add_argument("--prefix-filter", action="store_true", help="Also write the exact prefix filter")
+    parser.add_argument("--prefix-filter-bloom", action="store_true",
+                        help="Write the prefix filter as a Bloom filter instead (smaller, slower to probe)")
+    parser.add_argument("--reverse-index", action="store_true", help="Also write reverse_index.json")
+    parser.add_argument("--reduplication", action="store_true", help="Add doubled-syllable entries")
+    parser.add_argument("--reduplication-top-n", type=int, default=200,
+                        help="Number of reduplicated words to add with --reduplication (default: 200)")
+    parser.add_argument("--tiered", action="store_true", help="Also write the dictionary_cold.tsv cold tier")
+    parser.add_argument("--format", dest="output_format", default="pretty", choices=OUTPUT_FORMATS)
+    args = parser.parse_args()
+
+    if args.streaming:
+        conflicts = streaming_conflicts(args.sharded, args.prefix_filter, args.reverse_index,
+                                        args.tiered, args.output_format, args.prefix_filter_bloom)
+        if conflicts:
+            parser.error(f"--streaming cannot be combined with {', '.join(conflicts)}")
+
+    main(**vars(args))
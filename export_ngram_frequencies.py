@@ -6,29 +6,279 @@ This creates a compact JSON file with:
 1. Word frequencies (unigrams)
 2. Bigram frequencies (word pairs)
 3. Trigram frequencies (word triples)
+
+It can also emit a smoothed stupid-backoff language model whose
+log-probabilities are quantized to small integers (see ngram_scorer.py).
+
+Instead of fixed top-N cutoffs, --budget picks the bigram/trigram cutoffs
+that cover the most TNC frequency mass within a byte budget (file size, or
+in-memory size with --memory) and --curve prints coverage across budgets:
+
+    python export_ngram_frequencies.py --curve
+    python export_ngram_frequencies.py --budget 2MB
+
+Parsed TNC counts are cached as pickle snapshots keyed by the SHA-256 of
+the corpus files (see load_tnc_ngrams), so only the first run re-parses
+the corpus; on that cold run bigrams and trigrams are parsed in parallel.
 """
 
+import hashlib
 import json
-from pythainlp.corpus import tnc
+import math
+import os
+import pickle
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from pythainlp.corpus import get_corpus_path, tnc
+
+# Stupid backoff multiplier applied each time a lookup falls back one order
+BACKOFF_ALPHA = 0.4
+
+# Approximate per-entry overhead of a CPython dict (hash + key/value pointers, ~1.5x slots)
+DICT_ENTRY_BYTES = 36
+
+# Where parsed TNC n-gram counts are snapshotted between runs
+NGRAM_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "thai-phon")
+
+# n-gram order → PyThaiNLP corpus name of the file tnc.<order>_word_freqs() parses
+TNC_CORPORA = {
+    "bigram": "tnc_bigram_word_freqs",
+    "trigram": "tnc_trigram_word_freqs",
+}
 
-def export_ngram_frequencies(output_path: str, top_n_bigrams: int = 50000, top_n_trigrams: int = 10000):
+# {"bigrams": {...}, "trigrams": {...}} wrapper around the entries
+JSON_OVERHEAD_BYTES = 64
+
+# Budgets reported by --curve
+CURVE_BUDGETS = [256 * 1024, 512 * 1024, 1024 ** 2, 2 * 1024 ** 2, 4 * 1024 ** 2, 8 * 1024 ** 2, 16 * 1024 ** 2]
+
+
+def ngram_entry_bytes(key: str, freq: int, measure: str = "file") -> int:
     """
-    Export n-gram frequencies to JSON.
+    Cost of one "w1|w2": freq entry.
 
     Args:
-        output_path: Path to output JSON file
-        top_n_bigrams: Number of top bigrams to include (to keep file small)
-        top_n_trigrams: Number of top trigrams to include
+        key: "|"-joined n-gram
+        freq: Count
+        measure: "file" (bytes in the exported JSON) or "memory" (approximate
+            bytes once loaded into a Python dict)
     """
-    print("Loading n-gram frequencies from PyThaiNLP TNC corpus...")
+    if measure == "memory":
+        return sys.getsizeof(key) + sys.getsizeof(freq) + DICT_ENTRY_BYTES
+    # json.dump default separators: "key": freq, "key": freq
+    return len(json.dumps(key, ensure_ascii=False).encode('utf-8')) + len(str(freq)) + 4
 
-    # Get bigram and trigram frequencies
-    print("Loading bigrams...")
-    bigram_freqs = tnc.bigram_word_freqs()
 
-    print("Loading trigrams...")
-    trigram_freqs = tnc.trigram_word_freqs()
+def _cumulative(sorted_ngrams: List[Tuple[tuple, int]], measure: str) -> Tuple[List[int], List[int]]:
+    """Prefix sums of bytes and frequency mass over n-grams sorted by count."""
+    cum_bytes, cum_mass = [0], [0]
+    for ngram, freq in sorted_ngrams:
+        cum_bytes.append(cum_bytes[-1] + ngram_entry_bytes("|".join(ngram), freq, measure))
+        cum_mass.append(cum_mass[-1] + freq)
+    return cum_bytes, cum_mass
+
+
+def _best_cutoffs(bigram_cum: Tuple[List[int], List[int]], trigram_cum: Tuple[List[int], List[int]],
+                  budget_bytes: int) -> Tuple[int, int]:
+    """
+    Cutoffs (n_bigrams, n_trigrams) maximizing covered mass within the budget.
+
+    Each table is kept as a top-N prefix, so for every bigram cutoff the best
+    trigram cutoff is the longest prefix that still fits. The trigram pointer
+    only moves backwards as the bigram cutoff grows: O(n_bigrams + n_trigrams).
+    """
+    b_bytes, b_mass = bigram_cum
+    t_bytes, t_mass = trigram_cum
+    best = (-1, 0, 0)
+    n_tri = len(t_bytes) - 1
+    for n_bi in range(len(b_bytes)):
+        remaining = budget_bytes - b_bytes[n_bi]
+        if remaining < 0:
+            break
+        while t_bytes[n_tri] > remaining:
+            n_tri -= 1
+        mass = b_mass[n_bi] + t_mass[n_tri]
+        if mass > best[0]:
+            best = (mass, n_bi, n_tri)
+    return best[1], best[2]
+
+
+def choose_ngram_cutoffs(bigram_freqs: Dict[Tuple[str, str], int],
+                         trigram_freqs: Dict[Tuple[str, str, str], int],
+                         budgets: List[int], measure: str = "file") -> List[Dict]:
+    """
+    Pick top-N bigram/trigram cutoffs that maximize covered TNC frequency mass per budget.
+
+    Args:
+        bigram_freqs: Dictionary mapping (w1, w2) to counts
+        trigram_freqs: Dictionary mapping (w1, w2, w3) to counts
+        budgets: Byte budgets to solve for
+        measure: "file" or "memory" (see ngram_entry_bytes)
+
+    Returns:
+        One dict per budget with the cutoffs, the bytes they use and the share
+        of bigram, trigram and combined frequency mass they cover
+    """
+    sorted_bigrams = sorted(bigram_freqs.items(), key=lambda x: x[1], reverse=True)
+    sorted_trigrams = sorted(trigram_freqs.items(), key=lambda x: x[1], reverse=True)
+    bigram_cum = _cumulative(sorted_bigrams, measure)
+    trigram_cum = _cumulative(sorted_trigrams, measure)
+    bigram_total = bigram_cum[1][-1] or 1
+    trigram_total = trigram_cum[1][-1] or 1
+    overhead = JSON_OVERHEAD_BYTES if measure == "file" else 0
+
+    results = []
+    for budget in budgets:
+        n_bi, n_tri = _best_cutoffs(bigram_cum, trigram_cum, max(0, budget - overhead))
+        results.append({
+            "budget": budget,
+            "measure": measure,
+            "bigrams": n_bi,
+            "trigrams": n_tri,
+            "bytes": bigram_cum[0][n_bi] + trigram_cum[0][n_tri] + overhead,
+            "bigram_coverage": bigram_cum[1][n_bi] / bigram_total,
+            "trigram_coverage": trigram_cum[1][n_tri] / trigram_total,
+            "coverage": (bigram_cum[1][n_bi] + trigram_cum[1][n_tri]) / (bigram_total + trigram_total),
+        })
+    return results
+
+
+def print_coverage_curve(results: List[Dict]):
+    """Print the output of choose_ngram_cutoffs() as a table."""
+    print(f"\n{'budget':>9} {'bigrams':>9} {'trigrams':>9} {'used':>9} {'bi cov':>7} {'tri cov':>7} {'total':>7}")
+    for r in results:
+        print(f"{r['budget'] / 1024:>8.0f}K {r['bigrams']:>9,} {r['trigrams']:>9,} {r['bytes'] / 1024:>8.0f}K "
+              f"{r['bigram_coverage']:>7.1%} {r['trigram_coverage']:>7.1%} {r['coverage']:>7.1%}")
+
+
+def parse_size(text: str) -> int:
+    """Parse "512K", "2MB", "1.5M" or a plain byte count."""
+    text = text.strip().upper().rstrip('B')
+    for suffix, factor in (('K', 1024), ('M', 1024 ** 2), ('G', 1024 ** 3)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * factor)
+    return int(text)
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _snapshot_path(order: str, cache_dir: str) -> Optional[str]:
+    """Snapshot file for one order, or None if its corpus file cannot be located."""
+    corpus_path = get_corpus_path(TNC_CORPORA[order])
+    if not corpus_path or not os.path.isfile(corpus_path):
+        return None
+    return os.path.join(cache_dir, f"tnc_{order}-{_file_sha256(corpus_path)[:16]}.pickle")
+
+
+def _parse_tnc_order(order: str) -> Dict[tuple, int]:
+    """Parse one n-gram order from the PyThaiNLP corpus."""
+    if order == "bigram":
+        return dict(tnc.bigram_word_freqs())
+    return dict(tnc.trigram_word_freqs())
+
+
+def _write_snapshot(freqs: Dict[tuple, int], path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(freqs, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def _parse_and_snapshot(order: str, snapshot_path: Optional[str]):
+    """
+    Worker: parse one order and write its snapshot.
+
+    Returns the snapshot path rather than the counts, so the (large) dict is
+    serialized once to disk instead of once over the pipe and once more to disk.
+    """
+    freqs = _parse_tnc_order(order)
+    if snapshot_path is None:
+        return freqs
+    _write_snapshot(freqs, snapshot_path)
+    return snapshot_path
+
+
+def _read_snapshot(path: str) -> Dict[tuple, int]:
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def load_tnc_ngrams(cache_dir: str = NGRAM_CACHE_DIR,
+                    use_cache: bool = True) -> Tuple[Dict[Tuple[str, str], int], Dict[Tuple[str, str, str], int]]:
+    """
+    Load TNC bigram and trigram counts, from the snapshot cache when possible.
+
+    Snapshots are keyed by the SHA-256 of the corpus file they were parsed
+    from, so an updated corpus is re-parsed automatically. Orders missing
+    from the cache are parsed concurrently in separate processes (one per
+    order, if there are CPUs for it) and then snapshotted.
+
+    Args:
+        cache_dir: Directory holding the pickle snapshots
+        use_cache: False to always re-parse (and not write snapshots)
+
+    Returns:
+        (bigram_freqs, trigram_freqs)
+    """
+    freqs: Dict[str, Dict[tuple, int]] = {}
+    snapshots: Dict[str, Optional[str]] = {}
+    for order in TNC_CORPORA:
+        path = _snapshot_path(order, cache_dir) if use_cache else None
+        snapshots[order] = path
+        if path and os.path.exists(path):
+            print(f"Loading {order}s from snapshot {path}...")
+            freqs[order] = _read_snapshot(path)
+
+    missing = [order for order in TNC_CORPORA if order not in freqs]
+    if not missing:
+        return freqs["bigram"], freqs["trigram"]
+
+    print(f"Parsing {' and '.join(o + 's' for o in missing)} from PyThaiNLP TNC corpus...")
+    workers = min(len(missing), os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_parse_and_snapshot, missing, [snapshots[o] for o in missing]))
+        for order, result in zip(missing, results):
+            freqs[order] = _read_snapshot(result) if isinstance(result, str) else result
+    else:
+        for order in missing:
+            freqs[order] = _parse_tnc_order(order)
+            if snapshots[order]:
+                _write_snapshot(freqs[order], snapshots[order])
+
+    for order in missing:
+        if snapshots[order]:
+            print(f"Saved {order} snapshot to {snapshots[order]}")
+
+    return freqs["bigram"], freqs["trigram"]
+
+
+def write_ngram_frequencies(bigram_freqs: Dict[Tuple[str, str], int],
+                            trigram_freqs: Dict[Tuple[str, str, str], int],
+                            output_path: str, top_n_bigrams: int = 50000,
+                            top_n_trigrams: int = 10000) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    Write the top bigram/trigram counts as ngram_frequencies.json.
+
+    Args:
+        bigram_freqs: Dictionary mapping (w1, w2) to counts
+        trigram_freqs: Dictionary mapping (w1, w2, w3) to counts
+        output_path: Path to output JSON file
+        top_n_bigrams: Number of top bigrams to include
+        top_n_trigrams: Number of top trigrams to include
 
+    Returns:
+        (bigram_dict, trigram_dict) as written, keyed "w1|w2" / "w1|w2|w3"
+    """
     # Sort and take top N to reduce file size
     print(f"Sorting bigrams (keeping top {top_n_bigrams})...")
     sorted_bigrams = sorted(bigram_freqs.items(), key=lambda x: x[1], reverse=True)[:top_n_bigrams]
@@ -59,6 +309,37 @@ def export_ngram_frequencies(output_path: str, top_n_bigrams: int = 50000, top_n
     with open(output_path, 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=None)  # No indent for smaller file
 
+    return bigram_dict, trigram_dict
+
+
+def export_ngram_frequencies(output_path: str, top_n_bigrams: int = 50000, top_n_trigrams: int = 10000,
+                             budget_bytes: int = None, measure: str = "file", use_cache: bool = True):
+    """
+    Export n-gram frequencies to JSON.
+
+    Args:
+        output_path: Path to output JSON file
+        top_n_bigrams: Number of top bigrams to include (to keep file small)
+        top_n_trigrams: Number of top trigrams to include
+        budget_bytes: If set, choose both cutoffs to fit this budget instead
+        measure: What budget_bytes limits: "file" size or loaded "memory"
+        use_cache: Load parsed counts from the snapshot cache (see load_tnc_ngrams)
+    """
+    print("Loading n-gram frequencies from PyThaiNLP TNC corpus...")
+
+    # Get bigram and trigram frequencies
+    bigram_freqs, trigram_freqs = load_tnc_ngrams(use_cache=use_cache)
+
+    if budget_bytes is not None:
+        print(f"Choosing cutoffs for a {budget_bytes / 1024:.0f} KB {measure} budget...")
+        cutoffs = choose_ngram_cutoffs(bigram_freqs, trigram_freqs, [budget_bytes], measure)[0]
+        top_n_bigrams, top_n_trigrams = cutoffs["bigrams"], cutoffs["trigrams"]
+        print(f"  {top_n_bigrams:,} bigrams ({cutoffs['bigram_coverage']:.1%} of bigram mass), "
+              f"{top_n_trigrams:,} trigrams ({cutoffs['trigram_coverage']:.1%} of trigram mass)")
+
+    bigram_dict, trigram_dict = write_ngram_frequencies(
+        bigram_freqs, trigram_freqs, output_path, top_n_bigrams, top_n_trigrams)
+
     # Print statistics
     import os
     file_size = os.path.getsize(output_path) / (1024 * 1024)  # MB
@@ -92,6 +373,145 @@ def export_ngram_frequencies(output_path: str, top_n_bigrams: int = 50000, top_n
     else:
         print(f"✗ Test trigram 'ผม กิน ข้าว' not in top {top_n_trigrams}")
 
+def build_backoff_model(bigram_freqs: Dict[Tuple[str, str], int],
+                        trigram_freqs: Dict[Tuple[str, str, str], int],
+                        top_n_unigrams: int = 50000,
+                        top_n_bigrams: int = 50000,
+                        top_n_trigrams: int = 10000,
+                        bits: int = 8) -> Dict:
+    """
+    Build a stupid-backoff model with quantized log-probabilities.
+
+    Unigram counts are the left marginals of the full bigram table, so the
+    relative frequencies are computed before any cutoff is applied:
+        S(w3|w1,w2) = c(w1,w2,w3) / c(w1,w2)
+        S(w2|w1)    = c(w1,w2) / c(w1)
+        S(w)        = c(w) / N
+    Every missing order costs one BACKOFF_ALPHA factor.
+
+    Each value is stored as a cost: round(-log10(p) * scale), clamped to
+    the range of an unsigned `bits`-bit integer. Scoring a phrase is then a
+    sum of small integers (lower cost = more likely phrase).
+
+    Args:
+        bigram_freqs: Dictionary mapping (w1, w2) to counts
+        trigram_freqs: Dictionary mapping (w1, w2, w3) to counts
+        top_n_unigrams: Number of most frequent unigrams to keep
+        top_n_bigrams: Number of most frequent bigrams to keep
+        top_n_trigrams: Number of most frequent trigrams to keep
+        bits: Quantization width (8 or 16)
+
+    Returns:
+        JSON-serializable model dictionary
+    """
+    if bits not in (8, 16):
+        raise ValueError(f"bits must be 8 or 16, got {bits}")
+
+    unigram_counts = defaultdict(int)
+    for (w1, _), freq in bigram_freqs.items():
+        unigram_counts[w1] += freq
+    total = sum(unigram_counts.values())
+
+    sorted_unigrams = sorted(unigram_counts.items(), key=lambda x: x[1], reverse=True)[:top_n_unigrams]
+    sorted_bigrams = sorted(bigram_freqs.items(), key=lambda x: x[1], reverse=True)[:top_n_bigrams]
+    sorted_trigrams = sorted(trigram_freqs.items(), key=lambda x: x[1], reverse=True)[:top_n_trigrams]
+
+    # Negative log10 probabilities before quantization
+    unigram_logp = {w: -math.log10(freq / total) for w, freq in sorted_unigrams}
+    bigram_logp = {
+        (w1, w2): -math.log10(freq / unigram_counts[w1])
+        for (w1, w2), freq in sorted_bigrams
+        if unigram_counts.get(w1)
+    }
+    trigram_logp = {
+        (w1, w2, w3): -math.log10(freq / bigram_freqs[(w1, w2)])
+        for (w1, w2, w3), freq in sorted_trigrams
+        if bigram_freqs.get((w1, w2))
+    }
+
+    # Unknown words get half the mass of a singleton
+    unknown_logp = -math.log10(0.5 / total)
+    backoff_logp = -math.log10(BACKOFF_ALPHA)
+
+    max_cost = (1 << bits) - 1
+    scale = max_cost / unknown_logp
+
+    def quantize(logp: float) -> int:
+        return min(max_cost, max(0, int(round(logp * scale))))
+
+    return {
+        "format": "stupid-backoff",
+        "bits": bits,
+        "scale": scale,
+        "backoff": quantize(backoff_logp),
+        "unknown": quantize(unknown_logp),
+        "unigrams": {w: quantize(lp) for w, lp in unigram_logp.items()},
+        "bigrams": {f"{w1}|{w2}": quantize(lp) for (w1, w2), lp in bigram_logp.items()},
+        "trigrams": {f"{w1}|{w2}|{w3}": quantize(lp) for (w1, w2, w3), lp in trigram_logp.items()},
+    }
+
+
+def export_backoff_model(output_path: str, top_n_bigrams: int = 50000, top_n_trigrams: int = 10000,
+                         bits: int = 8, use_cache: bool = True):
+    """
+    Export a quantized stupid-backoff language model to JSON.
+
+    Args:
+        output_path: Path to output JSON file
+        top_n_bigrams: Number of top bigrams to include
+        top_n_trigrams: Number of top trigrams to include
+        bits: Quantization width (8 or 16)
+        use_cache: Load parsed counts from the snapshot cache (see load_tnc_ngrams)
+    """
+    print("Loading n-gram frequencies from PyThaiNLP TNC corpus...")
+    bigram_freqs, trigram_freqs = load_tnc_ngrams(use_cache=use_cache)
+
+    print(f"Building {bits}-bit stupid-backoff model...")
+    model = build_backoff_model(
+        bigram_freqs,
+        trigram_freqs,
+        top_n_bigrams=top_n_bigrams,
+        top_n_trigrams=top_n_trigrams,
+        bits=bits,
+    )
+
+    print(f"\nExporting to {output_path}...")
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(model, f, ensure_ascii=False, indent=None, separators=(',', ':'))
+
+    import os
+    file_size = os.path.getsize(output_path) / (1024 * 1024)  # MB
+
+    print(f"\n✓ Export complete!")
+    print(f"  Unigrams: {len(model['unigrams']):,}")
+    print(f"  Bigrams: {len(model['bigrams']):,}")
+    print(f"  Trigrams: {len(model['trigrams']):,}")
+    print(f"  Backoff cost: {model['backoff']}, unknown cost: {model['unknown']}")
+    print(f"  File size: {file_size:.1f} MB")
+
+
 if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export TNC n-gram frequencies")
+    parser.add_argument("--budget", type=parse_size, help="Byte budget for the n-gram tables (e.g. 2MB)")
+    parser.add_argument("--memory", action="store_true", help="Budget in-memory size instead of file size")
+    parser.add_argument("--curve", action="store_true", help="Only print the coverage curve")
+    parser.add_argument("--no-cache", action="store_true", help="Re-parse the corpus instead of using snapshots")
+    args = parser.parse_args()
+    measure = "memory" if args.memory else "file"
+    use_cache = not args.no_cache
+
+    if args.curve:
+        bigram_freqs, trigram_freqs = load_tnc_ngrams(use_cache=use_cache)
+        results = choose_ngram_cutoffs(bigram_freqs, trigram_freqs, CURVE_BUDGETS, measure)
+        print(f"Coverage of TNC n-gram frequency mass by {measure} budget:")
+        print_coverage_curve(results)
+        sys.exit(0)
+
     output_path = "/Users/fsonntag/Developer/thai-phon/ThaiPhoneticIM/ngram_frequencies.json"
-    export_ngram_frequencies(output_path, top_n_bigrams=50000, top_n_trigrams=10000)
+    export_ngram_frequencies(output_path, top_n_bigrams=50000, top_n_trigrams=10000,
+                             budget_bytes=args.budget, measure=measure, use_cache=use_cache)
+
+    model_path = "/Users/fsonntag/Developer/thai-phon/ThaiPhoneticIM/ngram_model.json"
+    export_backoff_model(model_path, top_n_bigrams=50000, top_n_trigrams=10000, bits=8, use_cache=use_cache)
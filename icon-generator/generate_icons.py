@@ -3,11 +3,24 @@
 Generate iOS App Icons for Thai Phonetic Keyboard
 Creates all required icon sizes with gradient background and Thai letter ส
 Following Apple Human Interface Guidelines for iOS app icons
+
+Usage:
+    python generate_icons.py              # draw every icon from scratch
+    python generate_icons.py --fast       # skip PNGs whose design and file are unchanged
+    python generate_icons.py --fast --force
+    python generate_icons.py --benchmark  # time both modes in a temp directory
 """
 
 from PIL import Image, ImageDraw, ImageFont
+import contextlib
+import hashlib
+import inspect
+import io
 import json
 import os
+import sys
+import tempfile
+import time
 from pathlib import Path
 
 # Design Configuration
@@ -23,6 +36,20 @@ SHADOW_COLOR = (0, 0, 0, 25)  # 10% opacity black
 SHADOW_OFFSET_RATIO = 0.002  # 2px at 1024px
 # Character size (percentage of icon size)
 CHAR_SIZE_RATIO = 0.65  # 65% of icon size
+# Character size for adaptive icon layers (fits the 66dp safe zone of 108dp)
+ADAPTIVE_CHAR_SIZE_RATIO = 0.55
+# Thai character drawn on the icon
+ICON_TEXT = "ส"
+# Thai-compatible system fonts, in order of preference
+FONT_PATHS = [
+    "/System/Library/Fonts/Supplemental/Thonburi.ttc",
+    "/System/Library/Fonts/Supplemental/Thonburi-Bold.ttf",
+    "/System/Library/Fonts/Supplemental/Ayuthaya.ttf",
+    "/Library/Fonts/Thonburi.ttc",
+]
+
+# --fast: design hash and file hash of every output written, next to this script
+ICON_CACHE_NAME = ".icon_cache.json"
 
 
 def create_gradient_background(size):
@@ -46,14 +73,7 @@ def create_gradient_background(size):
 def get_thai_font(size):
     """Get Thai-compatible system font at specified size"""
     # Try Thonburi Bold first (best for Thai)
-    font_paths = [
-        "/System/Library/Fonts/Supplemental/Thonburi.ttc",
-        "/System/Library/Fonts/Supplemental/Thonburi-Bold.ttf",
-        "/System/Library/Fonts/Supplemental/Ayuthaya.ttf",
-        "/Library/Fonts/Thonburi.ttc",
-    ]
-
-    for font_path in font_paths:
+    for font_path in FONT_PATHS:
         try:
             # For .ttc files, try to use the bold variant (index 1)
             if font_path.endswith('.ttc'):
@@ -85,7 +105,7 @@ def create_icon(size):
     font = get_thai_font(font_size)
 
     # Thai character
-    text = "ส"
+    text = ICON_TEXT
 
     # Create drawing context
     draw = ImageDraw.Draw(img)
@@ -179,9 +199,10 @@ def generate_contents_json():
     return contents
 
 
-def export_contentview_icon(script_dir):
+def export_contentview_icon(script_dir, pipeline=None):
     """Export a separate icon for use in ContentView UI"""
     print("\n📱 Exporting ContentView display icon...")
+    pipeline = pipeline or IconPipeline(script_dir)
 
     # Path to Assets in the iOS project
     assets_dir = script_dir.parent / "ThaiPhoneticKeyboard" / "ThaiPhoneticKeyboard" / "Assets.xcassets"
@@ -204,10 +225,8 @@ def export_contentview_icon(script_dir):
 
     for img_size, filename in sizes:
         print(f"  Generating {filename} ({img_size}×{img_size}px)...", end=" ")
-        icon = create_icon(img_size)
-        filepath = output_dir / filename
-        icon.save(filepath, 'PNG', optimize=True)
-        print("✓")
+        written = pipeline.save("icon", img_size, output_dir / filename)
+        print("✓" if written else "unchanged")
 
     # Create Contents.json for the image set
     contents = {
@@ -243,9 +262,10 @@ def export_contentview_icon(script_dir):
     return True
 
 
-def export_android_icons(script_dir):
+def export_android_icons(script_dir, pipeline=None):
     """Export Android launcher icons for all density buckets"""
     print("\n🤖 Exporting Android launcher icons...")
+    pipeline = pipeline or IconPipeline(script_dir)
 
     # Path to Android res directory
     android_res_dir = script_dir.parent / "ThaiPhoneticAndroid" / "app" / "src" / "main" / "res"
@@ -273,13 +293,9 @@ def export_android_icons(script_dir):
         mipmap_dir = android_res_dir / f"mipmap-{density}"
         mipmap_dir.mkdir(parents=True, exist_ok=True)
 
-        # Generate icon
-        icon = create_icon(size)
-
-        # Save as ic_launcher.png
-        filepath = mipmap_dir / "ic_launcher.png"
-        icon.save(filepath, 'PNG', optimize=True)
-        print("✓")
+        # Generate icon and save as ic_launcher.png
+        written = pipeline.save("icon", size, mipmap_dir / "ic_launcher.png")
+        print("✓" if written else "unchanged")
 
     print(f"  📁 Location: {android_res_dir}")
     return True
@@ -302,9 +318,9 @@ def create_adaptive_icon_foreground(size):
     # For adaptive icons, the character should fit in the 66dp safe zone
     # which is 61% of the 108dp canvas (66/108 = 0.611)
     # We'll use 55% to have some extra breathing room
-    font_size = int(size * 0.55)
+    font_size = int(size * ADAPTIVE_CHAR_SIZE_RATIO)
     font = get_thai_font(font_size)
-    text = "ส"
+    text = ICON_TEXT
 
     draw = ImageDraw.Draw(img)
     bbox = draw.textbbox((0, 0), text, font=font)
@@ -342,9 +358,9 @@ def create_adaptive_icon_monochrome(size):
     img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
 
     # Same sizing as foreground for consistency
-    font_size = int(size * 0.55)
+    font_size = int(size * ADAPTIVE_CHAR_SIZE_RATIO)
     font = get_thai_font(font_size)
-    text = "ส"
+    text = ICON_TEXT
 
     draw = ImageDraw.Draw(img)
     bbox = draw.textbbox((0, 0), text, font=font)
@@ -362,9 +378,100 @@ def create_adaptive_icon_monochrome(size):
     return img
 
 
-def export_android_adaptive_icons(script_dir):
+# Layer name → function drawing it from scratch at a given size
+LAYER_RENDERERS = {
+    "icon": create_icon,
+    "background": create_adaptive_icon_background,
+    "foreground": create_adaptive_icon_foreground,
+    "monochrome": create_adaptive_icon_monochrome,
+}
+
+
+def design_hash():
+    """Hash of every design constant and drawing function that changes how the icons look"""
+    font_path = next((path for path in FONT_PATHS if os.path.exists(path)), "default")
+    design = {
+        "top_color": TOP_COLOR,
+        "bottom_color": BOTTOM_COLOR,
+        "char_color": CHAR_COLOR,
+        "shadow_color": SHADOW_COLOR,
+        "shadow_offset_ratio": SHADOW_OFFSET_RATIO,
+        "char_size_ratio": CHAR_SIZE_RATIO,
+        "adaptive_char_size_ratio": ADAPTIVE_CHAR_SIZE_RATIO,
+        "text": ICON_TEXT,
+        "font": font_path,
+        # Editing a drawing function invalidates the cache like editing a constant
+        "renderers": [inspect.getsource(function) for function in (
+            create_gradient_background, get_thai_font, *LAYER_RENDERERS.values())],
+    }
+    return hashlib.sha256(json.dumps(design, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def file_sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class IconPipeline:
+    """
+    Renders icon layers and writes them as PNG files.
+
+    Every output is drawn from scratch at its own size (for these simple
+    layers that is faster than downsampling one large render). By default
+    every output is rewritten; with fast=True an output is skipped when
+    both the design hash and the file on disk match what the last run
+    wrote (recorded in .icon_cache.json next to this script).
+    """
+
+    def __init__(self, script_dir, fast=False, force=False):
+        self.root = Path(script_dir).parent
+        self.fast = fast
+        self.force = force
+        self.cache_path = Path(script_dir) / ICON_CACHE_NAME
+        self.cache = {}
+        if fast and not force and self.cache_path.exists():
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                self.cache = json.load(f)
+        self.design = design_hash() if fast else None
+        self.written = 0
+        self.skipped = 0
+
+    def render(self, layer, size):
+        """Image for one layer at `size`"""
+        return LAYER_RENDERERS[layer](size)
+
+    def save(self, layer, size, filepath):
+        """Write one layer at `size` to `filepath`; returns False if it was unchanged and skipped"""
+        filepath = Path(filepath)
+        try:
+            name = str(filepath.relative_to(self.root))
+        except ValueError:
+            name = str(filepath)
+        key = f"{self.design}:{layer}:{size}"
+
+        if self.fast and not self.force:
+            entry = self.cache.get(name)
+            if entry and entry["key"] == key and filepath.exists() and file_sha256(filepath) == entry["sha256"]:
+                self.skipped += 1
+                return False
+
+        self.render(layer, size).save(filepath, 'PNG', optimize=True)
+        self.written += 1
+        if self.fast:
+            self.cache[name] = {"key": key, "sha256": file_sha256(filepath)}
+        return True
+
+    def finish(self):
+        """Persist the output cache (fast mode only)"""
+        if self.fast:
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump(self.cache, f, indent=2, sort_keys=True)
+
+
+def export_android_adaptive_icons(script_dir, pipeline=None):
     """Export Android adaptive icon layers (background + foreground)"""
     print("\n📱 Exporting Android adaptive icons...")
+    pipeline = pipeline or IconPipeline(script_dir)
 
     # Path to Android res directory
     android_res_dir = script_dir.parent / "ThaiPhoneticAndroid" / "app" / "src" / "main" / "res"
@@ -391,24 +498,18 @@ def export_android_adaptive_icons(script_dir):
         mipmap_dir = android_res_dir / f"mipmap-{density}"
         mipmap_dir.mkdir(parents=True, exist_ok=True)
 
-        background = create_adaptive_icon_background(size)
-        bg_path = mipmap_dir / "ic_launcher_background.png"
-        background.save(bg_path, 'PNG', optimize=True)
-        print("✓")
+        written = pipeline.save("background", size, mipmap_dir / "ic_launcher_background.png")
+        print("✓" if written else "unchanged")
 
         # Generate foreground layer
         print(f"  Generating mipmap-{density}/ic_launcher_foreground.png ({size}×{size}px)...", end=" ")
-        foreground = create_adaptive_icon_foreground(size)
-        fg_path = mipmap_dir / "ic_launcher_foreground.png"
-        foreground.save(fg_path, 'PNG', optimize=True)
-        print("✓")
+        written = pipeline.save("foreground", size, mipmap_dir / "ic_launcher_foreground.png")
+        print("✓" if written else "unchanged")
 
         # Generate monochrome layer (for themed icons)
         print(f"  Generating mipmap-{density}/ic_launcher_monochrome.png ({size}×{size}px)...", end=" ")
-        monochrome = create_adaptive_icon_monochrome(size)
-        mono_path = mipmap_dir / "ic_launcher_monochrome.png"
-        monochrome.save(mono_path, 'PNG', optimize=True)
-        print("✓")
+        written = pipeline.save("monochrome", size, mipmap_dir / "ic_launcher_monochrome.png")
+        print("✓" if written else "unchanged")
 
     # Create adaptive icon XML files
     print("  Creating adaptive icon XML...", end=" ")
@@ -439,10 +540,11 @@ def export_android_adaptive_icons(script_dir):
     return True
 
 
-def main():
+def main(fast=False, force=False, script_dir=None):
     """Generate all iOS app icons and Contents.json"""
 
-    script_dir = Path(__file__).parent
+    script_dir = Path(script_dir) if script_dir else Path(__file__).parent
+    pipeline = IconPipeline(script_dir, fast=fast, force=force)
 
     # Path to Assets in the iOS project
     assets_dir = script_dir.parent / "ThaiPhoneticKeyboard" / "ThaiPhoneticKeyboard" / "Assets.xcassets"
@@ -469,13 +571,11 @@ def main():
     # Generate each icon
     for size in sorted(sizes_needed):
         print(f"  Generating {size}×{size}px...", end=" ")
-        icon = create_icon(size)
 
         # Save as PNG
         filename = f"icon_{size}x{size}.png"
-        filepath = output_dir / filename
-        icon.save(filepath, 'PNG', optimize=True)
-        print("✓")
+        written = pipeline.save("icon", size, output_dir / filename)
+        print("✓" if written else "unchanged")
 
     # Generate Contents.json
     print("\n  Generating Contents.json...", end=" ")
@@ -490,13 +590,17 @@ def main():
     print("✅ Success! iOS app icons generated.")
 
     # Export ContentView icon
-    contentview_exported = export_contentview_icon(script_dir)
+    contentview_exported = export_contentview_icon(script_dir, pipeline)
 
     # Export Android icons
-    android_exported = export_android_icons(script_dir)
+    android_exported = export_android_icons(script_dir, pipeline)
 
     # Export Android adaptive icons
-    adaptive_exported = export_android_adaptive_icons(script_dir)
+    adaptive_exported = export_android_adaptive_icons(script_dir, pipeline)
+
+    pipeline.finish()
+    if fast:
+        print(f"\n⚡ Fast mode: {pipeline.written} PNGs written, {pipeline.skipped} unchanged")
 
     print()
     print("=" * 60)
@@ -553,5 +657,39 @@ def main():
     print()
 
 
+def benchmark():
+    """Time a full regeneration and a no-op run in a scratch copy of the project layout"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        script_dir = tmp / "icon-generator"
+        script_dir.mkdir()
+        (tmp / "ThaiPhoneticKeyboard" / "ThaiPhoneticKeyboard" / "Assets.xcassets").mkdir(parents=True)
+        (tmp / "ThaiPhoneticAndroid" / "app" / "src" / "main" / "res").mkdir(parents=True)
+
+        def timed(**kwargs):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                main(script_dir=script_dir, **kwargs)
+            return time.perf_counter() - start
+
+        runs = [
+            ("full, per-size rendering", timed()),
+            ("no-op, per-size rendering", timed()),
+            ("full, --fast --force", timed(fast=True, force=True)),
+            ("no-op, --fast (all unchanged)", timed(fast=True)),
+        ]
+
+    print(f"{'run':<34} {'seconds':>8}")
+    for name, seconds in runs:
+        print(f"{name:<34} {seconds:>8.2f}")
+    # A full run renders the same way with or without --fast; the saving is
+    # the cache hits that skip unchanged outputs
+    print(f"\nTime saved by --fast cache hits: no-op {runs[1][1] - runs[3][1]:.2f}s "
+          f"({runs[1][1] / runs[3][1]:.1f}x)")
+
+
 if __name__ == "__main__":
-    main()
+    if "--benchmark" in sys.argv[1:]:
+        benchmark()
+    else:
+        main(fast="--fast" in sys.argv[1:], force="--force" in sys.argv[1:])
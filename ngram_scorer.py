@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Score Thai phrases with the quantized stupid-backoff model
+written by export_ngram_frequencies.export_backoff_model().
+
+Every model value is a small non-negative integer cost (a quantized
+-log10 probability), so scoring a phrase is a sum of ints:
+- no float products that underflow on long phrases
+- lower cost = more likely phrase
+"""
+
+import json
+from typing import Dict, List
+
+
+class QuantizedNgramScorer:
+    """Sums quantized log-probability costs with stupid backoff."""
+
+    def __init__(self, model: Dict):
+        if model.get("format") != "stupid-backoff":
+            raise ValueError(f"Unsupported n-gram model format: {model.get('format')!r}")
+
+        self.bits = model["bits"]
+        self.scale = model["scale"]
+        self.backoff = model["backoff"]
+        self.unknown = model["unknown"]
+        self.unigrams: Dict[str, int] = model["unigrams"]
+        self.bigrams: Dict[str, int] = model["bigrams"]
+        self.trigrams: Dict[str, int] = model["trigrams"]
+
+        # Every value must fit the declared quantization width
+        max_cost = (1 << self.bits) - 1
+        penalties = {"backoff": self.backoff, "unknown": self.unknown}
+        for table in (self.unigrams, self.bigrams, self.trigrams, penalties):
+            for key, cost in table.items():
+                if not 0 <= cost <= max_cost:
+                    raise ValueError(f"Cost {cost} for {key!r} does not fit in {self.bits} bits")
+
+    @classmethod
+    def load(cls, model_path: str) -> "QuantizedNgramScorer":
+        """Load a model JSON file produced by export_backoff_model()."""
+        with open(model_path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def word_cost(self, word: str, prev: str = None, prev2: str = None) -> int:
+        """
+        Cost of `word` given up to two previous words.
+
+        Args:
+            word: Word to score
+            prev: Previous word (None at phrase start)
+            prev2: Word before `prev` (None if unavailable)
+
+        Returns:
+            Quantized cost (sum of model values and backoff penalties)
+        """
+        penalty = 0
+
+        if prev2 is not None and prev is not None:
+            cost = self.trigrams.get(f"{prev2}|{prev}|{word}")
+            if cost is not None:
+                return cost
+            penalty += self.backoff
+
+        if prev is not None:
+            cost = self.bigrams.get(f"{prev}|{word}")
+            if cost is not None:
+                return penalty + cost
+            penalty += self.backoff
+
+        return penalty + self.unigrams.get(word, self.unknown)
+
+    def phrase_cost(self, words: List[str]) -> int:
+        """
+        Total cost of a word sequence (lower = more likely).
+
+        Args:
+            words: Thai words in order
+
+        Returns:
+            Sum of quantized costs for every word in the phrase
+        """
+        if not words:
+            return 0
+
+        unigrams = self.unigrams
+        bigrams = self.bigrams
+        trigrams = self.trigrams
+        backoff = self.backoff
+        unknown = self.unknown
+
+        total = unigrams.get(words[0], unknown)
+        for i in range(1, len(words)):
+            word = words[i]
+            prev = words[i - 1]
+            penalty = 0
+
+            if i >= 2:
+                cost = trigrams.get(f"{words[i - 2]}|{prev}|{word}")
+                if cost is not None:
+                    total += cost
+                    continue
+                penalty = backoff
+
+            cost = bigrams.get(f"{prev}|{word}")
+            if cost is not None:
+                total += penalty + cost
+            else:
+                total += penalty + backoff + unigrams.get(word, unknown)
+
+        return total
+
+    def log10_prob(self, words: List[str]) -> float:
+        """Approximate log10 probability of a phrase (for display/debugging)."""
+        return -self.phrase_cost(words) / self.scale
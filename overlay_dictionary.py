@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Overlay dictionaries merged over the base dictionary at lookup time.
+
+An overlay is a small file in the dictionary.json format (romanization →
+ranked Thai words), e.g. product names, place names or slang:
+
+    {"grab": ["แกร็บ"], "sukhumvit": ["สุขุมวิท"], "nan": ["น่าน"]}
+
+LayeredDictionary keeps the base dictionary untouched. When a key is
+looked up, it merges the lists from the base and from every overlay that
+has the key. A candidate at position i of a layer with weight w gets the
+slot i - w, so weight 0 interleaves with the base and weight 2 moves an
+overlay's candidates two places up. Ties go to the higher weight, then to
+the later-added layer. A word that appears in several layers keeps its
+best slot. Keys no overlay defines cost one extra set lookup. Merged lists
+are cached until an overlay changes, so the cache never outgrows the
+overlays.
+
+reload() re-reads only the overlay files that changed on disk, and swaps
+each one in as a new dict, so the base is never reloaded. An engine built
+over a LayeredDictionary keeps state derived from the overlays (its prefix
+filter and reranker cache), so reload through
+ThaiPhoneticEngine.reload_overlays() rather than calling reload() here.
+
+Lookups may run in other threads during reload(), add_overlay() and
+remove_overlay(). The overlays, the set of their keys and the merged-list
+cache are swapped in as one tuple, so a lookup sees the overlays either
+before or after a change (the new entries of a reloaded file may show up
+a moment before its new keys do). Changes themselves are serialized by a
+lock.
+
+Usage:
+    python overlay_dictionary.py ThaiPhoneticIM/dictionary.json places.json=2 slang.json nan grab
+"""
+
+import json
+import os
+import threading
+from typing import Dict, FrozenSet, Iterator, List, Mapping, Optional, Tuple
+
+DEFAULT_MAX_CANDIDATES = 9
+
+
+def parse_overlay_arg(text: str) -> Tuple[str, float]:
+    """"path" or "path=weight" → (path, weight)."""
+    path, sep, weight = text.rpartition('=')
+    if not sep:
+        return text, 0.0
+    return path, float(weight)
+
+
+class Overlay:
+    """One overlay file and the mtime/size it was loaded at."""
+
+    def __init__(self, path: str, weight: float = 0.0, name: str = None):
+        self.path = path
+        self.weight = weight
+        self.name = name or os.path.splitext(os.path.basename(path))[0]
+        self.entries: Dict[str, List[str]] = {}
+        self._signature: Optional[Tuple[float, int]] = None
+        self.reload()
+
+    def _file_signature(self) -> Tuple[float, int]:
+        info = os.stat(self.path)
+        return info.st_mtime_ns, info.st_size
+
+    def reload(self, force: bool = True) -> bool:
+        """
+        Re-read the file (only if it changed, unless `force`).
+
+        Returns:
+            True if the entries were replaced
+        """
+        signature = self._file_signature()
+        if not force and signature == self._signature:
+            return False
+        with open(self.path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        if not isinstance(entries, dict):
+            raise ValueError(f"Overlay {self.path} is not a key → candidates mapping")
+        # Keys are looked up lowercased, as in the base dictionary
+        self.entries = {key.lower(): list(words) for key, words in entries.items()}
+        self._signature = signature
+        return True
+
+
+class LayeredDictionary(Mapping):
+    """Read-only base dictionary with weighted overlays merged per lookup."""
+
+    def __init__(self, base: Mapping[str, List[str]], overlays: List[Overlay] = None,
+                 max_candidates: int = DEFAULT_MAX_CANDIDATES):
+        """
+        Args:
+            base: Romanization → ranked Thai words (any mapping with get() and `in`)
+            overlays: Overlays, lowest priority first (for weight ties)
+            max_candidates: Candidates kept per merged key
+        """
+        self.base = base
+        self.max_candidates = max_candidates
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._invalidate(list(overlays or []))
+
+    def _invalidate(self, overlays: List[Overlay]):
+        """Swap in `overlays` with their key set and an empty merged-list cache."""
+        keys = set()
+        for overlay in overlays:
+            keys.update(overlay.entries)
+        # (overlays, keys any overlay defines, key → merged list); one assignment
+        self._state: Tuple[Tuple[Overlay, ...], FrozenSet[str], Dict[str, Optional[List[str]]]] = (
+            tuple(overlays), frozenset(keys), {})
+
+    @property
+    def overlays(self) -> List[Overlay]:
+        """Overlays, lowest priority first."""
+        return list(self._state[0])
+
+    @property
+    def overlay_keys(self) -> FrozenSet[str]:
+        """Keys defined by at least one overlay."""
+        return self._state[1]
+
+    def add_overlay(self, path: str, weight: float = 0.0, name: str = None) -> Overlay:
+        overlay = Overlay(path, weight, name)
+        with self._lock:
+            self._invalidate(self.overlays + [overlay])
+        return overlay
+
+    def remove_overlay(self, name: str) -> bool:
+        with self._lock:
+            overlays = self.overlays
+            remaining = [overlay for overlay in overlays if overlay.name != name]
+            if len(remaining) == len(overlays):
+                return False
+            self._invalidate(remaining)
+        return True
+
+    def reload(self, force: bool = False) -> List[str]:
+        """
+        Re-read overlays whose files changed (all of them with `force`).
+
+        Returns:
+            Names of the reloaded overlays
+        """
+        with self._lock:
+            overlays = self.overlays
+            reloaded = [overlay.name for overlay in overlays if overlay.reload(force)]
+            if reloaded:
+                self._invalidate(overlays)
+                self.reloads += len(reloaded)
+        return reloaded
+
+    def _merge(self, key: str, overlays: Tuple[Overlay, ...]) -> Optional[List[str]]:
+        layers = []
+        base_words = self.base.get(key)
+        if base_words is not None:
+            layers.append((0.0, base_words))
+        for overlay in overlays:
+            words = overlay.entries.get(key)
+            if words is not None:
+                layers.append((overlay.weight, words))
+        if not layers:
+            return None
+        if len(layers) == 1:
+            return layers[0][1][:self.max_candidates]
+
+        # word → (slot, -weight, -layer order); lowest wins
+        best: Dict[str, Tuple[float, float, int]] = {}
+        for order, (weight, words) in enumerate(layers):
+            for position, word in enumerate(words):
+                rank = (position - weight, -weight, -order)
+                current = best.get(word)
+                if current is None or rank < current:
+                    best[word] = rank
+        return sorted(best, key=best.__getitem__)[:self.max_candidates]
+
+    def get(self, key: str, default=None):
+        overlays, overlay_keys, merged = self._state
+        if key not in overlay_keys:
+            return self.base.get(key, default)
+        if key in merged:
+            words = merged[key]
+        else:
+            words = merged[key] = self._merge(key, overlays)
+        return default if words is None else words
+
+    def __getitem__(self, key: str) -> List[str]:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return key in self._state[1] or key in self.base
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.base
+        for key in self._state[1]:
+            if key not in self.base:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self.base) + sum(1 for key in self._state[1] if key not in self.base)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Look up keys in a base dictionary with overlays")
+    parser.add_argument("base", help="dictionary.json")
+    parser.add_argument("args", nargs="+", help="Overlay files (path or path=weight, *.json) followed by keys")
+    arguments = parser.parse_args()
+
+    overlay_args = [a for a in arguments.args if parse_overlay_arg(a)[0].endswith(".json")]
+    keys = [a for a in arguments.args if a not in overlay_args]
+
+    with open(arguments.base, 'r', encoding='utf-8') as f:
+        dictionary = LayeredDictionary(json.load(f))
+    for overlay_arg in overlay_args:
+        overlay = dictionary.add_overlay(*parse_overlay_arg(overlay_arg))
+        print(f"Overlay {overlay.name}: {len(overlay.entries):,} keys, weight {overlay.weight:g}")
+    for key in keys:
+        print(f"{key} → {', '.join(dictionary.get(key.lower(), [])) or '(no candidates)'}")
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prefix-existence filter that lets the segmenter skip dictionary probes.
+
+greedySegment tries every prefix length (15 → 1) at every position, and for
+each one generates fuzzy variants and probes the dictionary; almost all of
+those probes miss. The filter answers two questions without probing:
+- can any dictionary key (or fuzzy variant of the input) start with this
+  substring? If not, stop extending it.
+- can this substring match a key at all? If not, skip its probes.
+
+Both are answered on a canonical form that every fuzzy rule in
+generate_fuzzy_variants() preserves:
+- t, s, d are dropped (t↔s, t↔d, t-dropping rules)
+- p → b (b↔p), i/y → e (i↔ee↔y)
+- runs of a, o, e collapse to one letter (a↔aa, o↔oo, e↔ee)
+A substring can only have a fuzzy match if its canonical form equals the
+canonical form of some key, so the filter never rejects a real match; it
+only lets through some strings that then miss.
+
+Two backends, both loaded with PrefixFilter.load():
+- exact sets (default): export_prefix_keys() writes the canonical keys one
+  per line and the prefix set is rebuilt at load time. A probe is a single
+  set lookup.
+- a Bloom filter with a tunable false-positive rate (opt-in), written by
+  export_prefix_filter(). The file is smaller and nothing is built at load
+  time, but each probe hashes twice, which costs about as much as the
+  dictionary probe it saves. Use it only on memory-constrained targets.
+"""
+
+import math
+import re
+import struct
+import zlib
+from typing import Iterable, List
+
+BLOOM_MAGIC = b"TPBF"
+BLOOM_VERSION = 1
+
+# Marks a complete canonical key (vs. a canonical prefix) in the Bloom filter
+KEY_TERMINATOR = "\x00"
+
+_CANONICAL_CHARS = {'t': '', 's': '', 'd': '', 'p': 'b', 'i': 'e', 'y': 'e'}
+_CANONICAL_TABLE = str.maketrans(_CANONICAL_CHARS)
+_CANONICAL_RUNS = re.compile(r'([aoe])\1+')
+
+
+def canonical_form(roman: str) -> str:
+    """
+    Canonical form shared by a romanization and all of its fuzzy variants.
+
+    Examples:
+        sawatdee, sawasdi, sawadee → awae
+        krab, krap → krab
+    """
+    return _CANONICAL_RUNS.sub(r'\1', roman.translate(_CANONICAL_TABLE))
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (CRC32 double hashing)."""
+
+    def __init__(self, n_bits: int, n_hashes: int, bits: bytearray = None):
+        self.n_bits = n_bits
+        self.n_hashes = n_hashes
+        self.bits = bits if bits is not None else bytearray((n_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, n_items: int, fp_rate: float) -> "BloomFilter":
+        """Size a filter for `n_items` with the given false-positive rate."""
+        n_items = max(1, n_items)
+        n_bits = max(8, int(math.ceil(-n_items * math.log(fp_rate) / (math.log(2) ** 2))))
+        n_hashes = max(1, int(round(n_bits / n_items * math.log(2))))
+        return cls(n_bits, n_hashes)
+
+    def _positions(self, item: str):
+        data = item.encode('utf-8')
+        h1 = zlib.crc32(data)
+        h2 = zlib.crc32(data, 0x9E3779B9) | 1
+        n_bits = self.n_bits
+        for i in range(self.n_hashes):
+            yield (h1 + i * h2) % n_bits
+
+    def add(self, item: str):
+        bits = self.bits
+        for pos in self._positions(item):
+            bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        # _positions() inlined: this runs once per segmentation step
+        data = item.encode('utf-8')
+        h1 = zlib.crc32(data)
+        h2 = zlib.crc32(data, 0x9E3779B9) | 1
+        bits = self.bits
+        n_bits = self.n_bits
+        for i in range(self.n_hashes):
+            pos = (h1 + i * h2) % n_bits
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def save(self, path: str):
+        """Write the filter as: magic, version, n_bits, n_hashes, bit array."""
+        with open(path, 'wb') as f:
+            f.write(struct.pack('<4sBQI', BLOOM_MAGIC, BLOOM_VERSION, self.n_bits, self.n_hashes))
+            f.write(self.bits)
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        with open(path, 'rb') as f:
+            header = f.read(struct.calcsize('<4sBQI'))
+            magic, version, n_bits, n_hashes = struct.unpack('<4sBQI', header)
+            if magic != BLOOM_MAGIC or version != BLOOM_VERSION:
+                raise ValueError(f"Not a prefix Bloom filter: {path}")
+            bits = bytearray(f.read())
+        return cls(n_bits, n_hashes, bits)
+
+
+class _BloomView:
+    """Adapts one Bloom filter to the two membership tests PrefixFilter needs."""
+
+    def __init__(self, bloom: BloomFilter, suffix: str = ""):
+        self.bloom = bloom
+        self.suffix = suffix
+
+    def __contains__(self, item: str) -> bool:
+        return (item + self.suffix) in self.bloom
+
+
+class _UnionView:
+    """Membership in any of several containers."""
+
+    def __init__(self, *containers):
+        self.containers = containers
+
+    def __contains__(self, item: str) -> bool:
+        return any(item in container for container in self.containers)
+
+
+class PrefixFilter:
+    """Canonical-prefix and canonical-key membership for the segmenter."""
+
+    def __init__(self, prefixes, keys):
+        """
+        Args:
+            prefixes: Container of every prefix of every canonical key
+            keys: Container of every complete canonical key
+        """
+        self.prefixes = prefixes
+        self.keys = keys
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[str]) -> "PrefixFilter":
+        """Exact (set-backed) filter over dictionary keys."""
+        return cls.from_canonical_keys(canonical_form(key) for key in keys)
+
+    @classmethod
+    def from_canonical_keys(cls, canonical_keys: Iterable[str]) -> "PrefixFilter":
+        """Exact (set-backed) filter over keys already in canonical form."""
+        canonical_keys = set(canonical_keys)
+        prefixes = {c[:i] for c in canonical_keys for i in range(len(c) + 1)}
+        return cls(prefixes, canonical_keys)
+
+    @classmethod
+    def load(cls, path: str) -> "PrefixFilter":
+        """
+        Filter written by export_prefix_keys() (exact) or
+        export_prefix_filter() (Bloom), told apart by the Bloom file magic.
+        """
+        with open(path, 'rb') as f:
+            magic = f.read(len(BLOOM_MAGIC))
+        if magic == BLOOM_MAGIC:
+            bloom = BloomFilter.load(path)
+            return cls(_BloomView(bloom), _BloomView(bloom, KEY_TERMINATOR))
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_canonical_keys(line.rstrip('\n') for line in f)
+
+    def with_keys(self, keys: Iterable[str]) -> "PrefixFilter":
+        """
+        A new filter that also admits `keys` (e.g. keys added by overlays).
+
+        Set-backed filters are merged into new sets; a Bloom-backed filter
+        is combined with exact sets for the extra keys.
+        """
+        extra = PrefixFilter.from_keys(keys)
+        if isinstance(self.prefixes, (set, frozenset)) and isinstance(self.keys, (set, frozenset)):
+            return PrefixFilter(self.prefixes | extra.prefixes, self.keys | extra.keys)
+        return PrefixFilter(_UnionView(self.prefixes, extra.prefixes), _UnionView(self.keys, extra.keys))
+
+    def candidate_lengths(self, text: str, max_length: int) -> List[int]:
+        """
+        Prefix lengths of `text` worth probing, longest first.
+
+        Extends the canonical form one character at a time and stops as soon
+        as no canonical key can start with it; of the lengths reached, only
+        those whose canonical form is a complete key are returned.
+
+        Args:
+            text: Remaining input at the current segmentation position
+            max_length: Longest prefix the segmenter would try
+
+        Returns:
+            Lengths to probe, in descending order
+        """
+        prefixes = self.prefixes
+        keys = self.keys
+        lengths = []
+        # canonical_form(text[:length]), built incrementally
+        canonical = ""
+        for length in range(1, max_length + 1):
+            char = text[length - 1]
+            mapped = _CANONICAL_CHARS.get(char, char)
+            if mapped and not (mapped in 'aoe' and canonical.endswith(mapped)):
+                canonical += mapped
+                if canonical not in prefixes:
+                    break
+            if canonical in keys:
+                lengths.append(length)
+        lengths.reverse()
+        return lengths
+
+
+def export_prefix_keys(keys: Iterable[str], output_path: str) -> int:
+    """
+    Save the exact prefix filter for a dictionary: its canonical keys, sorted,
+    one per line.
+
+    Args:
+        keys: Dictionary keys (romanizations)
+        output_path: Where to write the key list
+
+    Returns:
+        Number of canonical keys written
+    """
+    canonical_keys = sorted({canonical_form(key) for key in keys})
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for key in canonical_keys:
+            f.write(key + '\n')
+    return len(canonical_keys)
+
+
+def export_prefix_filter(keys: Iterable[str], output_path: str, fp_rate: float = 0.01) -> BloomFilter:
+    """
+    Build the Bloom-backed prefix filter for a dictionary and save it.
+
+    Smaller than export_prefix_keys() output but slower to probe; meant for
+    memory-constrained targets.
+
+    Args:
+        keys: Dictionary keys (romanizations)
+        output_path: Where to write the binary filter
+        fp_rate: Target false-positive rate
+
+    Returns:
+        The built BloomFilter
+    """
+    canonical_keys = {canonical_form(key) for key in keys}
+    prefixes = {c[:i] for c in canonical_keys for i in range(len(c) + 1)}
+
+    bloom = BloomFilter.for_capacity(len(prefixes) + len(canonical_keys), fp_rate)
+    for prefix in prefixes:
+        bloom.add(prefix)
+    for key in canonical_keys:
+        bloom.add(key + KEY_TERMINATOR)
+    bloom.save(output_path)
+    return bloom
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    import os
+
+    parser = argparse.ArgumentParser(description="Build the segmentation prefix filter")
+    parser.add_argument("dictionary", help="dictionary.json")
+    parser.add_argument("output", help="Output file (canonical key list, or .bloom with --bloom)")
+    parser.add_argument("--bloom", action="store_true", help="Write a Bloom filter instead of the exact key list")
+    parser.add_argument("--fp-rate", type=float, default=0.01, help="Bloom false-positive rate")
+    args = parser.parse_args()
+
+    with open(args.dictionary, 'r', encoding='utf-8') as f:
+        dictionary = json.load(f)
+    if args.bloom:
+        bloom = export_prefix_filter(dictionary.keys(), args.output, args.fp_rate)
+        print(f"Prefix Bloom filter: {bloom.n_bits:,} bits, {bloom.n_hashes} hashes, "
+              f"{os.path.getsize(args.output) / 1024:.1f} KB → {args.output}")
+    else:
+        count = export_prefix_keys(dictionary.keys(), args.output)
+        print(f"Prefix filter: {count:,} canonical keys, "
+              f"{os.path.getsize(args.output) / 1024:.1f} KB → {args.output}")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Thai word → romanization lookup.
+
+Reads reverse_index.json written by `export_dictionary_json.py --reverse-index`:
+
+    {"กิน": "kin|gin", "ผม": "phom|pom", ...}
+
+Romanizations are ranked so the first one is the best key to type for the
+word (the one that brings it up as the top candidate). Values stay as the
+packed strings until a word is looked up; a lookup is one dict access.
+
+Usage:
+    python reverse_index.py ThaiPhoneticIM/reverse_index.json กิน ข้าว [--tokenize]
+"""
+
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_REVERSE_INDEX_PATH = os.path.join(REPO_DIR, "ThaiPhoneticIM", "reverse_index.json")
+
+SEPARATOR = "|"
+YAMOK = "ๆ"
+
+
+class ReverseIndex:
+    """Read-only Thai word → ranked romanizations mapping."""
+
+    def __init__(self, packed: Dict[str, str]):
+        """
+        Args:
+            packed: Thai word → "|"-joined ranked romanizations
+        """
+        self.packed = packed
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_REVERSE_INDEX_PATH) -> "ReverseIndex":
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def __contains__(self, thai_word: str) -> bool:
+        return thai_word in self.packed
+
+    def __len__(self) -> int:
+        return len(self.packed)
+
+    def romanizations(self, thai_word: str) -> List[str]:
+        """All romanizations that bring up `thai_word`, best first ([] if unknown)."""
+        packed = self.packed.get(thai_word)
+        return packed.split(SEPARATOR) if packed else []
+
+    def primary(self, thai_word: str) -> Optional[str]:
+        """Best romanization of `thai_word`, or None if unknown."""
+        packed = self.packed.get(thai_word)
+        if not packed:
+            return None
+        end = packed.find(SEPARATOR)
+        return packed if end < 0 else packed[:end]
+
+    def lookup_many(self, tokens: Iterable[str]) -> List[List[str]]:
+        """Romanizations for each token of a tokenized text (aligned with `tokens`)."""
+        cache: Dict[str, List[str]] = {}
+        results = []
+        for token in tokens:
+            romanizations = cache.get(token)
+            if romanizations is None:
+                romanizations = cache[token] = self.romanizations(token)
+            results.append(romanizations)
+        return results
+
+    def romanize_tokens(self, tokens: Iterable[str], unknown: Optional[str] = None) -> List[Optional[str]]:
+        """
+        Primary romanization for each token of a tokenized text.
+
+        A standalone ๆ (tokenizers split it off) repeats the previous
+        token's romanization, e.g. ["ค่อย", "ๆ"] → ["khoi", "khoi"].
+
+        Args:
+            tokens: Thai tokens, e.g. from pythainlp word_tokenize()
+            unknown: Value returned for tokens not in the index
+
+        Returns:
+            List aligned with `tokens`
+        """
+        packed = self.packed
+        results: List[Optional[str]] = []
+        previous: Optional[str] = None
+        for token in tokens:
+            token = token.strip()
+            if token == YAMOK and previous is not None:
+                results.append(previous)
+                continue
+            value = packed.get(token)
+            if value:
+                end = value.find(SEPARATOR)
+                previous = value if end < 0 else value[:end]
+            else:
+                previous = None
+            results.append(previous if previous is not None else unknown)
+        return results
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Look up romanizations of Thai words")
+    parser.add_argument("reverse_index", help="reverse_index.json")
+    parser.add_argument("words", nargs="+", help="Thai words (or text with --tokenize)")
+    parser.add_argument("--tokenize", action="store_true", help="Tokenize the input with pythainlp first")
+    args = parser.parse_args()
+
+    index = ReverseIndex.load(args.reverse_index)
+    tokens = args.words
+    if args.tokenize:
+        from pythainlp.tokenize import word_tokenize
+        tokens = [t for t in word_tokenize(" ".join(args.words)) if t.strip()]
+
+    for token, romanizations in zip(tokens, index.lookup_many(tokens)):
+        print(f"{token}\t{', '.join(romanizations) if romanizations else '-'}")
+    print(" ".join(r or "?" for r in index.romanize_tokens(tokens)))
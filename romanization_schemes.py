@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pluggable romanization schemes for the dictionary build.
+
+Each scheme turns one (Thai word, RTGS romanization) pair from thai2rom into
+the keys a user of that scheme would type. Registered schemes:
+- rtgs:     the thai2rom romanization itself
+- paiboon:  rtgs_to_paiboon() (kin → gin, phom → pom)
+- iso11940: letter-by-letter ISO 11940 transliteration of the Thai script,
+            folded to ASCII (diacritics and tone marks dropped)
+- chat:     common chat spellings of the Paiboon form (krap → krab, di → dee)
+
+build_multi_scheme_index() runs all schemes in a single pass over thai2rom.
+Thai words are interned once in a shared word table and a key produced by
+several schemes is stored once, so each extra scheme only costs the keys
+no earlier scheme produced. The report lists those unique keys, their
+share of the output size and the time spent per scheme.
+
+Usage:
+    python romanization_schemes.py --output dictionary_multischeme.json [--schemes rtgs paiboon chat]
+"""
+
+import json
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from export_dictionary_json import doubled_yamok_keys, rtgs_to_paiboon
+
+# (Thai word, normalized RTGS romanization) → keys for this scheme
+SchemeFunction = Callable[[str, str], Iterable[str]]
+
+# Registration order decides which scheme a shared key is attributed to
+SCHEMES: Dict[str, SchemeFunction] = {}
+
+
+def register_scheme(name: str):
+    """Decorator that adds a scheme function to SCHEMES."""
+    def decorator(func: SchemeFunction) -> SchemeFunction:
+        SCHEMES[name] = func
+        return func
+    return decorator
+
+
+def _yamok_no_space(thai_word: str, rtgs: str) -> List[str]:
+    """Space-less form of yamok entries ("khoi khoi" → "khoikhoi")."""
+    if 'ๆ' in thai_word and ' ' in rtgs:
+        return [rtgs.replace(' ', '')]
+    return []
+
+
+@register_scheme("rtgs")
+def rtgs_scheme(thai_word: str, rtgs: str) -> List[str]:
+    return [rtgs] + _yamok_no_space(thai_word, rtgs)
+
+
+@register_scheme("paiboon")
+def paiboon_scheme(thai_word: str, rtgs: str) -> List[str]:
+    return [rtgs_to_paiboon(r) for r in [rtgs] + _yamok_no_space(thai_word, rtgs)]
+
+
+# ISO 11940 letters folded to ASCII (e.g. ข k̄h → kh, ā → a, æ → ae)
+ISO11940_ASCII = {
+    'ก': 'k', 'ข': 'kh', 'ฃ': 'kh', 'ค': 'kh', 'ฅ': 'kh', 'ฆ': 'kh', 'ง': 'ng',
+    'จ': 'c', 'ฉ': 'ch', 'ช': 'ch', 'ซ': 's', 'ฌ': 'ch', 'ญ': 'y',
+    'ฎ': 'd', 'ฏ': 't', 'ฐ': 'th', 'ฑ': 'th', 'ฒ': 'th', 'ณ': 'n',
+    'ด': 'd', 'ต': 't', 'ถ': 'th', 'ท': 'th', 'ธ': 'th', 'น': 'n',
+    'บ': 'b', 'ป': 'p', 'ผ': 'ph', 'ฝ': 'f', 'พ': 'ph', 'ฟ': 'f', 'ภ': 'ph', 'ม': 'm',
+    'ย': 'y', 'ร': 'r', 'ฤ': 'v', 'ล': 'l', 'ฦ': 'l', 'ว': 'w',
+    'ศ': 's', 'ษ': 's', 'ส': 's', 'ห': 'h', 'ฬ': 'l', 'อ': 'x', 'ฮ': 'h',
+    'ะ': 'a', 'ั': 'a', 'า': 'a', 'ำ': 'a', 'ิ': 'i', 'ี': 'i', 'ึ': 'u', 'ื': 'u',
+    'ุ': 'u', 'ู': 'u', 'เ': 'e', 'แ': 'ae', 'โ': 'o', 'ใ': 'i', 'ไ': 'i',
+    '๐': '0', '๑': '1', '๒': '2', '๓': '3', '๔': '4',
+    '๕': '5', '๖': '6', '๗': '7', '๘': '8', '๙': '9',
+}
+
+
+@register_scheme("iso11940")
+def iso11940_scheme(thai_word: str, rtgs: str) -> List[str]:
+    """Transliterate the Thai spelling; tone marks, ็, ์, ๆ, ฯ and spaces are dropped."""
+    letters = []
+    for char in thai_word:
+        mapped = ISO11940_ASCII.get(char)
+        if mapped is not None:
+            letters.append(mapped)
+        elif char.isascii() and char.isalnum():
+            letters.append(char.lower())
+    key = "".join(letters)
+    return [key] if len(key) >= 2 else []
+
+
+def chat_spelling(paiboon: str) -> str:
+    """
+    Common chat spelling of a Paiboon romanization.
+
+    - final p → b (krap → krab)
+    - final i → ee (sawatdi → sawatdee)
+    - final u → oo (du → doo)
+    - ue → eu (rueang → reuang)
+    """
+    result = paiboon.replace('ue', 'eu')
+    if result.endswith('p'):
+        result = result[:-1] + 'b'
+    elif result.endswith('i'):
+        result = result[:-1] + 'ee'
+    elif result.endswith('u'):
+        result = result[:-1] + 'oo'
+    return result
+
+
+@register_scheme("chat")
+def chat_scheme(thai_word: str, rtgs: str) -> List[str]:
+    return [chat_spelling(key) for key in paiboon_scheme(thai_word, rtgs)]
+
+
+def build_multi_scheme_index(thai_to_roman: Dict[str, List[str]], freq_map: Dict[str, int],
+                             yamok_map: Dict[str, str], schemes: List[str] = None,
+                             max_candidates: int = 9) -> Tuple[Dict, Dict[str, Dict]]:
+    """
+    Build one index for several romanization schemes in a single pass.
+
+    Applies the same frequency/yamok filters as create_inverted_index().
+    Thai words are interned in a shared table and every key is stored once,
+    no matter how many schemes produce it.
+
+    Args:
+        thai_to_roman: Dictionary mapping Thai words to RTGS romanizations
+        freq_map: Dictionary mapping Thai words to frequency counts
+        yamok_map: Dictionary mapping Thai words to RTGS romanizations for yamok words
+        schemes: Scheme names in attribution order (default: all registered)
+        max_candidates: Candidates kept per key
+
+    Returns:
+        (compact index, per-scheme report). The index has the form
+        {"format": "multi-scheme", "schemes": [...], "words": [...],
+         "index": {key: [word ids, ranked]}}
+    """
+    scheme_names = list(schemes or SCHEMES)
+    scheme_funcs = [(name, SCHEMES[name]) for name in scheme_names]
+
+    words: List[str] = []
+    word_ids: Dict[str, int] = {}
+    postings: Dict[str, List[int]] = {}
+    key_scheme: Dict[str, str] = {}
+    report = {name: {"keys": 0, "unique_keys": 0, "seconds": 0.0} for name in scheme_names}
+
+    def add(key: str, word_id: int, scheme: str):
+        ids = postings.get(key)
+        if ids is None:
+            postings[key] = [word_id]
+            key_scheme[key] = scheme
+            report[scheme]["unique_keys"] += 1
+        elif word_id not in ids:
+            ids.append(word_id)
+
+    def intern(thai_word: str) -> int:
+        word_id = word_ids.get(thai_word)
+        if word_id is None:
+            word_id = word_ids[thai_word] = len(words)
+            words.append(thai_word)
+        return word_id
+
+    for thai_word, romanizations in thai_to_roman.items():
+        if 'ๆ' not in thai_word and thai_word not in freq_map:
+            continue
+        word_id = intern(thai_word)
+
+        for rtgs in romanizations:
+            rtgs = rtgs.lower().strip()
+            if not rtgs:
+                continue
+            for name, func in scheme_funcs:
+                start = time.perf_counter()
+                keys = set(func(thai_word, rtgs))
+                for key in keys:
+                    add(key, word_id, name)
+                stats = report[name]
+                stats["keys"] += len(keys)
+                stats["seconds"] += time.perf_counter() - start
+
+    # Doubled syllable entries for curated yamok words (rtgs / paiboon forms)
+    for thai_word, rtgs in yamok_map.items():
+        rtgs = rtgs.lower().strip()
+        if not rtgs:
+            continue
+        word_id = intern(thai_word + 'ๆ')
+        for name, doubled in zip(("rtgs", "paiboon"), doubled_yamok_keys(rtgs)):
+            if name in report:
+                add(doubled, word_id, name)
+
+    # Rank, truncate and compact the word table to the words still referenced
+    def rank_key(word_id: int):
+        word = words[word_id]
+        return (-freq_map.get(word, 0), len(word), word)
+
+    kept_words: List[str] = []
+    remap: Dict[int, int] = {}
+    index: Dict[str, List[int]] = {}
+    for key, ids in postings.items():
+        ranked = sorted(ids, key=rank_key)[:max_candidates]
+        compact_ids = []
+        for word_id in ranked:
+            new_id = remap.get(word_id)
+            if new_id is None:
+                new_id = remap[word_id] = len(kept_words)
+                kept_words.append(words[word_id])
+            compact_ids.append(new_id)
+        index[key] = compact_ids
+
+    for stats in report.values():
+        stats["bytes"] = 0
+    for key, ids in index.items():
+        report[key_scheme[key]]["bytes"] += (len(json.dumps(key, ensure_ascii=False).encode('utf-8'))
+                                             + len(json.dumps(ids, separators=(',', ':'))) + 2)
+
+    compact = {
+        "format": "multi-scheme",
+        "schemes": scheme_names,
+        "words": kept_words,
+        "index": index,
+    }
+    return compact, report
+
+
+def expand_multi_scheme_index(compact: Dict) -> Dict[str, List[str]]:
+    """Turn a compact multi-scheme index back into the dictionary.json mapping."""
+    words = compact["words"]
+    return {key: [words[i] for i in ids] for key, ids in compact["index"].items()}
+
+
+def main():
+    import argparse
+    import os
+
+    from export_dictionary_json import load_frequency_data, load_thai_romanization_data, load_yamok_words
+
+    parser = argparse.ArgumentParser(description="Build a multi-scheme romanization index")
+    parser.add_argument("--thai2rom", default="/Users/fsonntag/Developer/thai-phon/thai2rom/data.csv")
+    parser.add_argument("--freq", default="/Users/fsonntag/Developer/thai-phon/tnc_freq.txt")
+    parser.add_argument("--yamok", default="/Users/fsonntag/Developer/thai-phon/yamok_words.csv")
+    parser.add_argument("--output", default="/Users/fsonntag/Developer/thai-phon/ThaiPhoneticIM/dictionary_multischeme.json")
+    parser.add_argument("--schemes", nargs="+", choices=list(SCHEMES), default=list(SCHEMES))
+    args = parser.parse_args()
+
+    print("Loading Thai romanization data...")
+    thai_to_roman = load_thai_romanization_data(args.thai2rom)
+    freq_map = load_frequency_data(args.freq)
+    yamok_map = load_yamok_words(args.yamok)
+
+    print(f"Building index for schemes: {', '.join(args.schemes)}...")
+    start = time.perf_counter()
+    compact, report = build_multi_scheme_index(thai_to_roman, freq_map, yamok_map, args.schemes)
+    total_seconds = time.perf_counter() - start
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(compact, f, ensure_ascii=False, separators=(',', ':'))
+
+    print(f"\nExported {len(compact['index']):,} keys, {len(compact['words']):,} shared Thai words "
+          f"to {args.output} ({os.path.getsize(args.output) / 1024:.0f} KB, {total_seconds:.1f}s)")
+    print(f"\n{'scheme':<10} {'keys':>10} {'unique':>10} {'KB':>8} {'seconds':>8}")
+    for name in args.schemes:
+        stats = report[name]
+        print(f"{name:<10} {stats['keys']:>10,} {stats['unique_keys']:>10,} "
+              f"{stats['bytes'] / 1024:>8.0f} {stats['seconds']:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lazily loaded, sharded dictionary.
+
+export_dictionary_json.export_sharded_dictionary() splits dictionary.json by
+key prefix into small shard files plus a manifest:
+
+    manifest.json
+    {
+      "format": "sharded-dictionary",
+      "prefix_length": 2,
+      "total_keys": 198123,
+      "shards": {"kh": {"file": "shard-6b68.json", "keys": 2316, "bytes": 41230}, ...}
+    }
+
+ShardedDictionary reads only the manifest at startup and loads a shard the
+first time a key with its prefix is looked up. With max_bytes set, least
+recently used shards are evicted once the loaded shards exceed the cap
+(measured by shard file size).
+
+One instance can be shared between threads. Lookups in a loaded shard
+take no lock. A missing shard is read and parsed outside the lock, and
+only inserting it (and evicting others) is locked, so threads hitting
+loaded shards never wait behind another thread's disk read. Two threads
+missing the same shard may both read it; the first one to insert wins.
+"""
+
+import itertools
+import json
+import os
+import threading
+from typing import Dict, Iterator, List, Mapping, Optional
+
+MANIFEST_NAME = "manifest.json"
+
+
+def shard_prefix(key: str, prefix_length: int) -> str:
+    """Shard a key belongs to (keys shorter than the prefix are their own shard)."""
+    return key[:prefix_length]
+
+
+def shard_filename(prefix: str) -> str:
+    """Filesystem-safe shard file name (keys may contain spaces and '-')."""
+    return f"shard-{prefix.encode('utf-8').hex()}.json"
+
+
+class ShardedDictionary(Mapping):
+    """Read-only romanization → Thai words mapping backed by shard files."""
+
+    def __init__(self, manifest_path: str, max_bytes: int = None):
+        """
+        Args:
+            manifest_path: Path to manifest.json (or the directory holding it)
+            max_bytes: Cap on the summed file size of loaded shards (None = no cap)
+        """
+        if os.path.isdir(manifest_path):
+            manifest_path = os.path.join(manifest_path, MANIFEST_NAME)
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("format") != "sharded-dictionary":
+            raise ValueError(f"Not a sharded dictionary manifest: {manifest_path}")
+
+        self.directory = os.path.dirname(os.path.abspath(manifest_path))
+        self.prefix_length: int = manifest["prefix_length"]
+        self.total_keys: int = manifest["total_keys"]
+        self.shards: Dict[str, Dict] = manifest["shards"]
+        self.max_bytes = max_bytes
+
+        # prefix → shard contents; prefix → tick of its last use (for eviction)
+        self._loaded: Dict[str, Dict[str, List[str]]] = {}
+        self._last_used: Dict[str, int] = {}
+        self._ticks = itertools.count()
+        self.loaded_bytes = 0
+        self.shard_loads = 0
+        self.shard_evictions = 0
+        self._lock = threading.Lock()
+
+    def _shard(self, prefix: str) -> Optional[Dict[str, List[str]]]:
+        """Return the shard for `prefix`, loading it (and evicting others) if needed."""
+        shard = self._loaded.get(prefix)
+        if shard is not None:
+            if self.max_bytes is not None:
+                self._last_used[prefix] = next(self._ticks)
+            return shard
+
+        info = self.shards.get(prefix)
+        if info is None:
+            return None
+        with open(os.path.join(self.directory, info["file"]), 'r', encoding='utf-8') as f:
+            shard = json.load(f)
+
+        with self._lock:
+            # Another thread may have loaded it while this one was reading
+            existing = self._loaded.get(prefix)
+            if existing is not None:
+                return existing
+            self._loaded[prefix] = shard
+            self._last_used[prefix] = next(self._ticks)
+            self.loaded_bytes += info["bytes"]
+            self.shard_loads += 1
+
+            if self.max_bytes is not None:
+                # Never evict the shard that was just loaded
+                while self.loaded_bytes > self.max_bytes and len(self._loaded) > 1:
+                    evicted = min((p for p in self._loaded if p != prefix), key=self._last_used.get)
+                    del self._loaded[evicted]
+                    del self._last_used[evicted]
+                    self.loaded_bytes -= self.shards[evicted]["bytes"]
+                    self.shard_evictions += 1
+
+        return shard
+
+    def get(self, key: str, default=None):
+        shard = self._shard(key[:self.prefix_length])
+        if shard is None:
+            return default
+        return shard.get(key, default)
+
+    def __getitem__(self, key: str) -> List[str]:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        shard = self._shard(key[:self.prefix_length])
+        return shard is not None and key in shard
+
+    def __iter__(self) -> Iterator[str]:
+        # Reads shards from disk without caching them, so a full scan
+        # does not blow the memory cap
+        for prefix, info in self.shards.items():
+            shard = self._loaded.get(prefix)
+            if shard is None:
+                with open(os.path.join(self.directory, info["file"]), 'r', encoding='utf-8') as f:
+                    shard = json.load(f)
+            yield from shard
+
+    def __len__(self) -> int:
+        return self.total_keys
@@ -0,0 +1,735 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Thai Phonetic Transformation Engine (Python reference port)
+
+Ported from the Kotlin implementation (ThaiPhoneticEngine.kt), which in turn
+was ported from Swift (ThaiPhoneticIMController.swift).
+Handles:
+- Loading dictionary (romanization → Thai words)
+- Loading n-gram frequencies (bigrams, trigrams) or the quantized model
+- Fuzzy matching (vowel/consonant variants)
+- Multi-word segmentation
+- Candidate generation and ranking
+- Optional context reranking of single-word candidates (context_reranker.py)
+
+One engine can be shared by many threads: lookups never write to the
+tables or the engine, all scratch state (candidate lists, combination
+heaps, per-query counters) is local to the call, and the opt-in helpers
+with caches (EngineStats, ContextReranker, ShardedDictionary) lock their
+own updates. freeze() turns the candidate lists into tuples so callers
+cannot change a shared table through a returned value.
+
+Used by the build and evaluation tools to reproduce what the keyboards show.
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from engine_stats import EngineStats
+
+MAX_WORD_LENGTH = 15
+MAX_PER_POSITION = 3
+MAX_COMBINATIONS = 50
+MAX_MULTI_WORD_CANDIDATES = 6
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DICTIONARY_PATH = os.path.join(REPO_DIR, "ThaiPhoneticIM", "dictionary.json")
+DEFAULT_NGRAM_PATH = os.path.join(REPO_DIR, "ThaiPhoneticIM", "ngram_frequencies.json")
+
+
+def generate_fuzzy_variants(roman: str) -> List[str]:
+    """
+    Generate fuzzy variants of a romanization.
+
+    Port of ThaiPhoneticEngine.generateFuzzyVariants (Kotlin). The result
+    keeps the Kotlin LinkedHashSet insertion order, since the fuzzy path
+    returns candidates in variant order.
+
+    Examples:
+        - sawatdi → sawatdee, sawasdee, sawasdi, sawadee
+        - aroi → aloi, aroy
+
+    Args:
+        roman: Lowercase romanization
+
+    Returns:
+        Ordered list of unique variants (including the input) of length >= 2
+    """
+    # dict as an insertion-ordered set
+    variants = {roman: None}
+
+    # Pattern 1: Final 'i' ↔ 'ee' (sawatdi ↔ sawatdee)
+    if roman.endswith('i'):
+        variants[roman[:-1] + 'ee'] = None
+    if roman.endswith('ee'):
+        variants[roman[:-2] + 'i'] = None
+
+    # Pattern 2: Final 'y' ↔ 'i' ↔ 'ee' (aroy, aroi, aroee)
+    if roman.endswith('y'):
+        variants[roman[:-1] + 'i'] = None
+        variants[roman[:-1] + 'ee'] = None
+    if roman.endswith('i') and len(roman) > 2:
+        variants[roman[:-1] + 'y'] = None
+    if roman.endswith('ee') and len(roman) > 3:
+        variants[roman[:-2] + 'y'] = None
+
+    # Pattern 3: 't' ↔ 's' (common confusion: sawatdi ↔ sawasdi)
+    if 't' in roman:
+        variants[roman.replace('t', 's')] = None
+    if 's' in roman:
+        variants[roman.replace('s', 't')] = None
+
+    # Pattern 4: 't' ↔ 'd' (common confusion: sawatdi ↔ sawaddi)
+    if 't' in roman:
+        variants[roman.replace('t', 'd')] = None
+    if 'd' in roman:
+        variants[roman.replace('d', 't')] = None
+
+    # Pattern 5: Long vowel doubling - BIDIRECTIONAL (aa ↔ a, oo ↔ o, ee ↔ e)
+    if 'aa' in roman:
+        variants[roman.replace('aa', 'a')] = None
+    elif 'a' in roman:
+        variants[roman.replace('a', 'aa', 1)] = None
+
+    if 'oo' in roman:
+        variants[roman.replace('oo', 'o')] = None
+    elif 'o' in roman:
+        variants[roman.replace('o', 'oo', 1)] = None
+
+    if 'ee' in roman and not roman.endswith('ee'):
+        variants[roman.replace('ee', 'e')] = None
+    elif 'e' in roman and 'ee' not in roman:
+        variants[roman.replace('e', 'ee', 1)] = None
+
+    # Pattern 6: Combined transformations for common cases
+    combined = []
+    for v in variants:
+        if v.endswith('i'):
+            combined.append(v[:-1] + 'ee')
+        if v.endswith('ee'):
+            combined.append(v[:-2] + 'i')
+    for v in combined:
+        variants[v] = None
+
+    # Pattern 7: Remove 't' before final vowel (sawatdi → sawadi, sawatdee → sawadee)
+    if 'tdi' in roman:
+        variants[roman.replace('tdi', 'di')] = None
+        variants[roman.replace('tdi', 'dee')] = None
+    if 'tdee' in roman:
+        variants[roman.replace('tdee', 'dee')] = None
+        variants[roman.replace('tdee', 'di')] = None
+    if 'ti' in roman and len(roman) > 3:
+        variants[roman.replace('ti', 'i')] = None
+        variants[roman.replace('ti', 'ee')] = None
+    if 'tee' in roman and len(roman) > 4:
+        variants[roman.replace('tee', 'ee')] = None
+        variants[roman.replace('tee', 'i')] = None
+
+    # Pattern 8: b ↔ p (krab ↔ krap)
+    if 'b' in roman:
+        variants[roman.replace('b', 'p')] = None
+    if 'p' in roman:
+        variants[roman.replace('p', 'b')] = None
+
+    # Remove any empty or single-char variants
+    return [v for v in variants if len(v) >= 2]
+
+
+class CandidateResult(NamedTuple):
+    """Candidates plus how they were found."""
+    candidates: List[str]
+    # exact / fuzzy / segmented / none
+    path: str
+    # True when a deadline cut the search short
+    partial: bool = False
+    # Number of input characters the candidates cover
+    consumed: int = 0
+
+
+class ThaiPhoneticEngine:
+    """Candidate generation and ranking, mirroring the keyboard engines."""
+
+    def __init__(self, dictionary: Dict[str, List[str]],
+                 bigram_frequencies: Dict[str, int] = None,
+                 trigram_frequencies: Dict[str, int] = None,
+                 scorer=None,
+                 prefix_filter=None):
+        """
+        Args:
+            dictionary: Romanization → ranked Thai words (any mapping with
+                get() and `in`, e.g. a ShardedDictionary)
+            bigram_frequencies: "w1|w2" → count (ngram_frequencies.json)
+            trigram_frequencies: "w1|w2|w3" → count
+            scorer: Optional QuantizedNgramScorer; replaces raw-count scoring
+            prefix_filter: Optional PrefixFilter consulted before segmentation probes;
+                keys added by overlays (overlay_dictionary.py) are admitted on top
+        """
+        self.dictionary = dictionary
+        self.bigram_frequencies = bigram_frequencies or {}
+        self.trigram_frequencies = trigram_frequencies or {}
+        self.scorer = scorer
+        # Filter over the base keys; prefix_filter also admits overlay keys
+        self.base_prefix_filter = prefix_filter
+        self.prefix_filter = self._overlay_prefix_filter()
+
+        # Opt-in instrumentation (see engine_stats.py)
+        self.stats: Optional[EngineStats] = None
+        # Created on first use (see enable_context_reranking())
+        self.reranker = None
+        # Guards the lazy creation of stats / reranker
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_files(cls, dictionary_path: str = DEFAULT_DICTIONARY_PATH,
+                   ngram_path: str = DEFAULT_NGRAM_PATH,
+                   model_path: str = None,
+                   max_shard_bytes: int = None,
+                   prefix_filter: str = None,
+                   overlays: List[Tuple[str, float]] = None) -> "ThaiPhoneticEngine":
+        """
+        Load an engine from the JSON files shipped with the keyboards.
+
+        Args:
+            dictionary_path: Path to dictionary.json (or .jsonl), a multi-scheme
+                index (romanization_schemes.py), or a sharded dictionary's
+                manifest.json / directory (loaded lazily)
+            ngram_path: Path to ngram_frequencies.json (None to skip)
+            model_path: Path to a quantized ngram_model.json (None to skip)
+            max_shard_bytes: Memory cap for a sharded dictionary (None = no cap)
+            prefix_filter: Path to an exported prefix filter (exact key list or
+                Bloom filter), or "exact" to build the set-backed filter from
+                the dictionary keys (None = off);
+                keys added by overlays are admitted on top of either
+            overlays: (path, weight) overlay dictionaries merged over the base
+                at lookup time (see overlay_dictionary.py)
+
+        Returns:
+            Ready-to-use engine
+        """
+        if os.path.isdir(dictionary_path) or os.path.basename(dictionary_path) == "manifest.json":
+            from sharded_dictionary import ShardedDictionary
+            dictionary = ShardedDictionary(dictionary_path, max_bytes=max_shard_bytes)
+        elif dictionary_path.endswith(".jsonl"):
+            from export_dictionary_json import load_dictionary_jsonl
+            dictionary = load_dictionary_jsonl(dictionary_path)
+        else:
+            with open(dictionary_path, 'r', encoding='utf-8') as f:
+                dictionary = json.load(f)
+            if dictionary.get("format") == "multi-scheme":
+                from romanization_schemes import expand_multi_scheme_index
+                dictionary = expand_multi_scheme_index(dictionary)
+
+        if prefix_filter == "exact":
+            from prefix_filter import PrefixFilter
+            prefix_filter = PrefixFilter.from_keys(dictionary)
+        elif prefix_filter:
+            from prefix_filter import PrefixFilter
+            prefix_filter = PrefixFilter.load(prefix_filter)
+
+        if overlays:
+            from overlay_dictionary import LayeredDictionary
+            dictionary = LayeredDictionary(dictionary)
+            for overlay_path, weight in overlays:
+                dictionary.add_overlay(overlay_path, weight)
+
+        bigrams, trigrams = {}, {}
+        if ngram_path:
+            with open(ngram_path, 'r', encoding='utf-8') as f:
+                ngrams = json.load(f)
+            bigrams = ngrams.get("bigrams", {})
+            trigrams = ngrams.get("trigrams", {})
+
+        scorer = None
+        if model_path:
+            from ngram_scorer import QuantizedNgramScorer
+            scorer = QuantizedNgramScorer.load(model_path)
+
+        return cls(dictionary, bigrams, trigrams, scorer, prefix_filter)
+
+    def enable_stats(self) -> EngineStats:
+        """Attach (or return the already attached) EngineStats."""
+        if self.stats is None:
+            with self._lock:
+                if self.stats is None:
+                    self.stats = EngineStats()
+        return self.stats
+
+    def enable_context_reranking(self, cache_size: int = 256):
+        """Attach (or return the already attached) ContextReranker."""
+        if self.reranker is None:
+            with self._lock:
+                if self.reranker is None:
+                    from context_reranker import ContextReranker
+                    self.reranker = ContextReranker.for_engine(self, cache_size)
+        return self.reranker
+
+    def _overlay_prefix_filter(self):
+        """base_prefix_filter extended with the keys overlays define (if any)."""
+        overlay_keys = getattr(self.dictionary, "overlay_keys", None)
+        if self.base_prefix_filter is None or not overlay_keys:
+            return self.base_prefix_filter
+        return self.base_prefix_filter.with_keys(overlay_keys)
+
+    def reload_overlays(self, force: bool = False) -> List[str]:
+        """
+        Hot-reload changed overlay files (see overlay_dictionary.py).
+
+        Besides LayeredDictionary.reload(), rebuilds the prefix filter so
+        keys an overlay added are not pruned from segmentation, and clears
+        the context reranker's cache of lists built from the old overlays.
+        Queries may run in other threads meanwhile; each one sees the
+        overlays from before or after the reload.
+
+        Args:
+            force: Re-read every overlay, changed or not
+
+        Returns:
+            Names of the reloaded overlays (empty without overlays)
+        """
+        reload = getattr(self.dictionary, "reload", None)
+        if reload is None:
+            return []
+        reloaded = reload(force)
+        if reloaded:
+            self.prefix_filter = self._overlay_prefix_filter()
+            if self.reranker is not None:
+                self.reranker.clear_cache()
+        return reloaded
+
+    def freeze(self) -> "ThaiPhoneticEngine":
+        """
+        Prepare the engine for sharing between threads.
+
+        Candidate lists of a plain-dict dictionary become tuples, so a
+        caller holding a lookup_segment() result cannot modify the shared
+        table. The outer dicts stay plain dicts: nothing writes to them
+        after construction, and a read-only proxy would slow every probe.
+
+        Returns:
+            self
+        """
+        if type(self.dictionary) is dict:
+            self.dictionary = {key: tuple(words) for key, words in self.dictionary.items()}
+        return self
+
+    def get_candidates(self, text: str, deadline: float = None,
+                       context: Sequence[str] = None) -> List[str]:
+        """
+        Get Thai candidates for a given romanization input.
+
+        Port of ThaiPhoneticEngine.getCandidates (Kotlin): exact lookup,
+        then single-word fuzzy lookup, then multi-word segmentation.
+
+        Args:
+            text: Romanized input
+            deadline: Optional time budget in seconds (see search())
+            context: Previously committed words, oldest first (see search())
+
+        Returns:
+            Ranked Thai candidates (empty if nothing matched)
+        """
+        return self.search(text, deadline, context).candidates
+
+    def search(self, text: str, deadline: float = None,
+               context: Sequence[str] = None) -> CandidateResult:
+        """
+        Get Thai candidates together with the path and completeness flags.
+
+        Without a deadline this is exactly get_candidates(). With a deadline
+        (seconds from now) the clock is checked before every segmentation
+        prefix probe and before scoring each multi-word combination, which
+        are enumerated in the same order as without a deadline. When time
+        runs out the best candidates found so far are returned with
+        partial=True; a cut-off segmentation only covers the first
+        `consumed` input characters.
+
+        With `context`, exact and fuzzy (single-word) candidates are
+        reordered by their n-gram score after the previously committed
+        words; segmented phrases are already n-gram ranked.
+
+        Args:
+            text: Romanized input
+            deadline: Optional time budget in seconds
+            context: Previously committed words, oldest first
+
+        Returns:
+            CandidateResult
+        """
+        stats = self.stats
+        deadline_at = None if deadline is None else time.perf_counter() + deadline
+        if stats is None:
+            return self._rerank(self._search(text, None, None, deadline_at), text, context)
+
+        query = stats.begin_query()
+        start = time.perf_counter()
+        result = self._rerank(self._search(text, stats, query, deadline_at), text, context)
+        if result.partial:
+            query["partial_results"] += 1
+        stats.end_query(query, text, result.path, time.perf_counter() - start, len(result.candidates))
+        return result
+
+    def _rerank(self, result: CandidateResult, text: str,
+                context: Optional[Sequence[str]]) -> CandidateResult:
+        """Apply context reranking to single-word results."""
+        if not context or result.path not in ("exact", "fuzzy"):
+            return result
+        reranker = self.enable_context_reranking()
+        return result._replace(candidates=reranker.rerank(result.candidates, context, text.lower()))
+
+    def _search(self, text: str, stats: Optional[EngineStats], query: Optional[Dict[str, int]],
+                deadline_at: Optional[float]) -> CandidateResult:
+        """search() body; deadline_at is an absolute perf_counter() time."""
+        if not text:
+            return CandidateResult([], "none")
+
+        dictionary = self.dictionary
+        lowercase_input = text.lower()
+
+        # Try single-word lookup first (exact match)
+        if stats is not None:
+            start = time.perf_counter()
+            query["dictionary_probes"] += 1
+        candidates = dictionary.get(lowercase_input)
+        if stats is not None:
+            stats.add_phase("exact", start)
+        if candidates is not None:
+            # Copy: the list belongs to the (shared) dictionary
+            return CandidateResult(list(candidates), "exact", consumed=len(text))
+
+        # Try single-word fuzzy matching
+        if stats is not None:
+            start = time.perf_counter()
+        fuzzy_variants = generate_fuzzy_variants(lowercase_input)
+        single_word_candidates = []
+        seen_words = set()
+        for variant in fuzzy_variants:
+            candidates = dictionary.get(variant)
+            if candidates is None:
+                continue
+            for candidate in candidates:
+                if candidate not in seen_words:
+                    single_word_candidates.append(candidate)
+                    seen_words.add(candidate)
+        if stats is not None:
+            query["fuzzy_variants"] += len(fuzzy_variants)
+            query["dictionary_probes"] += len(fuzzy_variants)
+            stats.add_phase("fuzzy", start)
+
+        # If single-word lookup found results, use them
+        if single_word_candidates:
+            return CandidateResult(single_word_candidates, "fuzzy", consumed=len(text))
+
+        # Try multi-word segmentation
+        if stats is not None:
+            start = time.perf_counter()
+        segments, segmented_all = self._segment(lowercase_input, query, deadline_at)
+        if stats is not None:
+            stats.add_phase("segment", start)
+
+        if segments:
+            if stats is not None:
+                start = time.perf_counter()
+            if deadline_at is None:
+                multi_word_candidates = self.generate_multi_word_candidates(segments, query)
+                combined_all = True
+            else:
+                multi_word_candidates, combined_all, segments = self._deadline_candidates(
+                    segments, query, deadline_at)
+            if stats is not None:
+                stats.add_phase("combine", start)
+
+            if multi_word_candidates:
+                partial = not (segmented_all and combined_all)
+                return CandidateResult(
+                    multi_word_candidates[:MAX_MULTI_WORD_CANDIDATES],
+                    "segmented",
+                    partial=partial,
+                    consumed=sum(len(segment) for segment in segments),
+                )
+
+        # No matches found (or the deadline hit before the first segment)
+        return CandidateResult([], "none", partial=not segmented_all)
+
+    def greedy_segment(self, text: str, query: Dict[str, int] = None) -> Optional[List[str]]:
+        """
+        Segment input into multiple words using greedy longest-match.
+
+        Port of ThaiPhoneticEngine.greedySegment (Kotlin).
+
+        Args:
+            text: Lowercase romanized input
+            query: Scratch counters when instrumentation is enabled
+
+        Returns:
+            Romanization segments, or None if segmentation fails
+        """
+        segments, _ = self._segment(text, query, None)
+        return segments
+
+    def _segment(self, text: str, query: Optional[Dict[str, int]],
+                 deadline_at: Optional[float]) -> Tuple[Optional[List[str]], bool]:
+        """
+        Greedy segmentation that can stop at a deadline.
+
+        Returns:
+            (segments, True) on success, (None, True) if some position has
+            no match, or (segments so far, False) if the deadline hit first
+        """
+        dictionary = self.dictionary
+        prefix_filter = self.prefix_filter
+        result = []
+        remaining = text
+
+        while remaining:
+            matched = False
+
+            # Try longest matches first, skipping lengths the prefix filter rules out
+            max_length = min(len(remaining), MAX_WORD_LENGTH)
+            if prefix_filter is None:
+                lengths = range(max_length, 0, -1)
+            else:
+                lengths = prefix_filter.candidate_lengths(remaining, max_length)
+                if query is not None:
+                    query["prefix_filter_skips"] += max_length - len(lengths)
+
+            for length in lengths:
+                if deadline_at is not None and time.perf_counter() > deadline_at:
+                    return result, False
+
+                prefix = remaining[:length]
+                if query is not None:
+                    query["segment_prefix_attempts"] += 1
+                    query["dictionary_probes"] += 1
+
+                # Try exact match first
+                if prefix in dictionary:
+                    matched = True
+                else:
+                    # Try fuzzy match
+                    fuzzy_variants = generate_fuzzy_variants(prefix)
+                    if query is not None:
+                        query["fuzzy_variants"] += len(fuzzy_variants)
+                    for variant in fuzzy_variants:
+                        if query is not None:
+                            query["dictionary_probes"] += 1
+                        if variant in dictionary:
+                            matched = True
+                            break
+
+                if matched:
+                    result.append(prefix)  # Store original input, not variant
+                    remaining = remaining[length:]
+                    break
+
+            # If no match found, segmentation failed
+            if not matched:
+                return None, True
+
+        return result, True
+
+    def lookup_segment(self, segment: str, query: Dict[str, int] = None) -> List[str]:
+        """
+        Lookup a single segment, trying exact then fuzzy matching.
+
+        Port of ThaiPhoneticEngine.lookupSegment (Kotlin).
+        """
+        dictionary = self.dictionary
+
+        if query is not None:
+            query["dictionary_probes"] += 1
+        candidates = dictionary.get(segment)
+        if candidates is not None:
+            return candidates
+
+        fuzzy_variants = generate_fuzzy_variants(segment)
+        if query is not None:
+            query["fuzzy_variants"] += len(fuzzy_variants)
+        for variant in fuzzy_variants:
+            if query is not None:
+                query["dictionary_probes"] += 1
+            candidates = dictionary.get(variant)
+            if candidates is not None:
+                return candidates
+
+        return []
+
+    def score_phrase(self, words: List[str]) -> float:
+        """
+        Score a phrase using n-gram data (higher = more likely phrase).
+
+        Port of ThaiPhoneticEngine.scorePhrase (Kotlin) when only raw counts
+        are loaded. With a quantized scorer the score is the negated integer
+        cost, which keeps the same "higher is better" ordering.
+        """
+        if not words:
+            return 0.0
+
+        if self.scorer is not None:
+            return -self.scorer.phrase_cost(words)
+
+        if len(words) == 1:
+            # Single word: base score
+            return 1000.0
+
+        score = 1.0
+
+        # Add bigram scores
+        for i in range(len(words) - 1):
+            bigram_freq = self.bigram_frequencies.get(f"{words[i]}|{words[i + 1]}")
+            if bigram_freq is not None:
+                score *= bigram_freq
+            else:
+                # No bigram data: penalize but don't eliminate
+                score *= 0.01
+
+        # Add trigram scores (if available)
+        for i in range(len(words) - 2):
+            trigram_freq = self.trigram_frequencies.get(f"{words[i]}|{words[i + 1]}|{words[i + 2]}")
+            if trigram_freq is not None:
+                # Trigrams are less common, so boost them more
+                score *= trigram_freq * 10.0
+
+        return score
+
+    def generate_multi_word_candidates(self, segments: List[str], query: Dict[str, int] = None) -> List[str]:
+        """
+        Generate Thai candidates by joining top matches from each segment.
+
+        Port of ThaiPhoneticEngine.generateMultiWordCandidates (Kotlin).
+        Returns up to 6 candidates, sorted by n-gram scores.
+        """
+        candidate_sets = []
+
+        # Lookup each segment
+        for segment in segments:
+            candidates = self.lookup_segment(segment, query)
+            if not candidates:
+                return []  # If any segment has no matches, fail
+            candidate_sets.append(candidates)
+
+        if len(candidate_sets) == 1:
+            # Single word, return top candidates
+            return list(candidate_sets[0][:MAX_MULTI_WORD_CANDIDATES])
+
+        # Multi-word: generate combinations and score them
+        scored_combinations: List[Tuple[str, float]] = []
+
+        def generate_combinations(position: int, current_words: List[str]):
+            if position >= len(candidate_sets):
+                # Complete combination
+                scored_combinations.append(("".join(current_words), self.score_phrase(current_words)))
+                return
+
+            # Try top N candidates for this position
+            for candidate in candidate_sets[position][:MAX_PER_POSITION]:
+                generate_combinations(position + 1, current_words + [candidate])
+
+                # Limit total combinations to avoid explosion
+                if len(scored_combinations) >= MAX_COMBINATIONS:
+                    return
+
+        generate_combinations(0, [])
+        if query is not None:
+            query["combinations_scored"] += len(scored_combinations)
+
+        # Sort by score (descending, stable like Kotlin's sortByDescending) and return top 6
+        scored_combinations.sort(key=lambda x: x[1], reverse=True)
+
+        return [phrase for phrase, _ in scored_combinations[:MAX_MULTI_WORD_CANDIDATES]]
+
+    def _deadline_candidates(self, segments: List[str], query: Optional[Dict[str, int]],
+                             deadline_at: float) -> Tuple[List[str], bool, List[str]]:
+        """
+        Deadline-aware generate_multi_word_candidates().
+
+        The unbounded search scores the first MAX_COMBINATIONS combinations
+        of the per-position top candidates in depth-first order. This
+        scores that same set, but best-first: by the sum of the
+        per-segment candidate ranks (all top-1 words first, then every
+        single-step demotion, ...), so alternatives for leading segments
+        are reached before the deadline rather than only the trailing
+        segments varying. Ties in score are broken by depth-first position,
+        so a deadline that never fires gives exactly the unbounded result.
+        The first combination is always scored. If the deadline hits while
+        looking up segments, only the segments looked up so far are
+        combined.
+
+        Returns:
+            (top candidates, True if nothing was cut short, segments used)
+        """
+        candidate_sets = []
+        finished = True
+        for segment in segments:
+            if candidate_sets and time.perf_counter() > deadline_at:
+                finished = False
+                break
+            candidates = self.lookup_segment(segment, query)
+            if not candidates:
+                return [], True, segments
+            candidate_sets.append(candidates[:MAX_PER_POSITION])
+        segments = segments[:len(candidate_sets)]
+
+        if len(candidate_sets) == 1:
+            return list(candidate_sets[0][:MAX_MULTI_WORD_CANDIDATES]), finished, segments
+
+        # (rank sum, depth-first position, indices) of the bounded set, best first
+        ranges = [range(len(candidates)) for candidates in candidate_sets]
+        frontier = sorted(
+            (sum(indices), position, indices)
+            for position, indices in enumerate(itertools.islice(itertools.product(*ranges), MAX_COMBINATIONS))
+        )
+
+        # (score, depth-first position, phrase)
+        scored_combinations: List[Tuple[float, int, str]] = []
+        for _, position, indices in frontier:
+            if scored_combinations and time.perf_counter() > deadline_at:
+                finished = False
+                break
+            words = [candidate_sets[i][j] for i, j in enumerate(indices)]
+            scored_combinations.append((self.score_phrase(words), position, "".join(words)))
+        if query is not None:
+            query["combinations_scored"] += len(scored_combinations)
+
+        # Score descending, then depth-first order (as the unbounded stable sort)
+        scored_combinations.sort(key=lambda x: (-x[0], x[1]))
+        return [phrase for _, _, phrase in scored_combinations[:MAX_MULTI_WORD_CANDIDATES]], finished, segments
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Look up Thai candidates for romanized input")
+    parser.add_argument("inputs", nargs="+", help="Romanized inputs, e.g. pomginkao")
+    parser.add_argument("--dictionary", default=DEFAULT_DICTIONARY_PATH)
+    parser.add_argument("--ngrams", default=DEFAULT_NGRAM_PATH)
+    parser.add_argument("--model", default=None, help="Quantized ngram_model.json")
+    parser.add_argument("--prefix-filter", default=None, help='Exported prefix filter path, or "exact"')
+    parser.add_argument("--overlay", action="append", default=[], metavar="PATH[=WEIGHT]",
+                        help="Overlay dictionary merged over the base (repeatable)")
+    parser.add_argument("--deadline-ms", type=float, default=None, help="Per-query time budget")
+    parser.add_argument("--context", nargs="+", default=None, help="Previously committed Thai words")
+    parser.add_argument("--stats", choices=["json", "prometheus"], help="Print instrumentation after the lookups")
+    args = parser.parse_args()
+
+    from overlay_dictionary import parse_overlay_arg
+    engine = ThaiPhoneticEngine.from_files(args.dictionary, args.ngrams, args.model,
+                                           prefix_filter=args.prefix_filter,
+                                           overlays=[parse_overlay_arg(o) for o in args.overlay])
+    if args.stats:
+        engine.enable_stats()
+
+    deadline = None if args.deadline_ms is None else args.deadline_ms / 1000.0
+    for text in args.inputs:
+        result = engine.search(text, deadline, args.context)
+        flag = " [partial]" if result.partial else ""
+        print(f"{text} → {', '.join(result.candidates) or '(no candidates)'}{flag}")
+
+    if args.stats == "json":
+        print(engine.stats.to_json())
+    elif args.stats == "prometheus":
+        print(engine.stats.to_prometheus(), end="")
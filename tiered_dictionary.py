@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Hot/cold tiered dictionary.
+
+dictionary.json keeps the top 9 candidates per key (number key selection
+1-9); everything past that is the cold tier, written by
+`export_dictionary_json.py --tiered` as dictionary_cold.tsv:
+
+    khao\tเขา|ข้าว|เข้า|...     (candidates 10+, ranked, "|"-joined)
+
+Lines are sorted by the UTF-8 bytes of the key. TieredDictionary loads the
+hot file as before and only memory-maps the cold file, so startup cost does
+not grow with the tail. A cold lookup is a binary search over byte offsets
+(find the first line starting at or after the midpoint, compare its key);
+the OS pages in just the lines it touches.
+
+Usage:
+    python tiered_dictionary.py ThaiPhoneticIM/dictionary.json ThaiPhoneticIM/dictionary_cold.tsv khao [--page 1]
+"""
+
+import json
+import mmap
+import os
+from typing import Dict, Iterator, List, Mapping, Optional
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_COLD_PATH = os.path.join(REPO_DIR, "ThaiPhoneticIM", "dictionary_cold.tsv")
+
+SEPARATOR = "|"
+PAGE_SIZE = 9
+
+
+def export_cold_tier(dictionary: Dict[str, List[str]], output_path: str, hot_candidates: int = 9) -> int:
+    """
+    Write candidates past `hot_candidates` of every key as a sorted cold file.
+
+    Args:
+        dictionary: Romanization → fully ranked Thai words (not truncated)
+        output_path: Where to write dictionary_cold.tsv
+        hot_candidates: Candidates per key kept in the hot file
+
+    Returns:
+        Number of keys written
+    """
+    entries = sorted(
+        (key.encode('utf-8'), words[hot_candidates:])
+        for key, words in dictionary.items()
+        if len(words) > hot_candidates
+    )
+    with open(output_path, 'wb') as f:
+        for key, tail in entries:
+            f.write(key + b'\t' + SEPARATOR.join(tail).encode('utf-8') + b'\n')
+    return len(entries)
+
+
+class ColdTier:
+    """Memory-mapped, sorted key → tail lookup."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        # mmap cannot map an empty file
+        self._map: Optional[mmap.mmap] = None
+        self.size = 0
+        self._file.seek(0, 2)
+        if self._file.tell() > 0:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.size = len(self._map)
+        self.probes = 0
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _line_start(self, position: int) -> int:
+        """Start of the first line starting at or after `position` (size if none)."""
+        if position == 0:
+            return 0
+        newline = self._map.find(b'\n', position - 1)
+        return self.size if newline < 0 else newline + 1
+
+    def _key_at(self, start: int) -> bytes:
+        return self._map[start:self._map.find(b'\t', start)]
+
+    def get(self, key: str) -> List[str]:
+        """Candidates past the hot tier for `key` ([] if none)."""
+        if self._map is None:
+            return []
+        target = key.encode('utf-8')
+
+        # Smallest position whose next line has a key >= target
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = self._line_start(mid)
+            self.probes += 1
+            if start < self.size and self._key_at(start) < target:
+                lo = start + 1
+            else:
+                hi = mid
+
+        start = self._line_start(lo)
+        if start >= self.size:
+            return []
+        tab = self._map.find(b'\t', start)
+        if self._map[start:tab] != target:
+            return []
+        end = self._map.find(b'\n', tab)
+        if end < 0:
+            end = self.size
+        return self._map[tab + 1:end].decode('utf-8').split(SEPARATOR)
+
+    def __iter__(self) -> Iterator[str]:
+        if self._map is None:
+            return
+        self._map.seek(0)
+        for line in iter(self._map.readline, b''):
+            yield line[:line.index(b'\t')].decode('utf-8')
+
+
+class TieredDictionary(Mapping):
+    """
+    Hot dictionary with a paged cold tail.
+
+    As a mapping it behaves like the hot dictionary (what the engine and the
+    keyboards show); candidates() and page() continue into the cold tier.
+    """
+
+    def __init__(self, hot: Mapping[str, List[str]], cold_path: str = DEFAULT_COLD_PATH):
+        """
+        Args:
+            hot: Romanization → top ranked Thai words (dictionary.json contents)
+            cold_path: Path to dictionary_cold.tsv
+        """
+        self.hot = hot
+        self.cold = ColdTier(cold_path)
+
+    @classmethod
+    def load(cls, hot_path: str, cold_path: str = DEFAULT_COLD_PATH) -> "TieredDictionary":
+        with open(hot_path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), cold_path)
+
+    def close(self):
+        self.cold.close()
+
+    def get(self, key: str, default=None):
+        return self.hot.get(key, default)
+
+    def __getitem__(self, key: str) -> List[str]:
+        return self.hot[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self.hot
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.hot)
+
+    def __len__(self) -> int:
+        return len(self.hot)
+
+    def candidates(self, key: str, offset: int = 0, limit: int = None) -> List[str]:
+        """
+        Ranked candidates for `key` across both tiers.
+
+        The cold tier is only read when the requested range goes past the
+        hot candidates.
+
+        Args:
+            key: Romanization
+            offset: Index of the first candidate to return
+            limit: Maximum number of candidates (None = all remaining)
+
+        Returns:
+            Candidates offset..offset+limit ([] past the end or for unknown keys)
+        """
+        hot = self.hot.get(key)
+        if hot is None:
+            return []
+        end = None if limit is None else offset + limit
+        if end is not None and end <= len(hot):
+            return hot[offset:end]
+        return (hot + self.cold.get(key))[offset:end]
+
+    def page(self, key: str, number: int, page_size: int = PAGE_SIZE) -> List[str]:
+        """Page `number` (0 = the hot candidates with the default page size)."""
+        return self.candidates(key, number * page_size, page_size)
+
+    def iter_pages(self, key: str, page_size: int = PAGE_SIZE) -> Iterator[List[str]]:
+        """All non-empty pages for `key`, hot first."""
+        words = self.candidates(key)
+        for start in range(0, len(words), page_size):
+            yield words[start:start + page_size]
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Page through hot and cold dictionary candidates")
+    parser.add_argument("hot", help="dictionary.json")
+    parser.add_argument("cold", help="dictionary_cold.tsv")
+    parser.add_argument("keys", nargs="+", help="Romanizations")
+    parser.add_argument("--page", type=int, default=None, help="Show only this page (default: all)")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    args = parser.parse_args()
+
+    dictionary = TieredDictionary.load(args.hot, args.cold)
+    for key in args.keys:
+        if args.page is not None:
+            pages = [(args.page, dictionary.page(key, args.page, args.page_size))]
+        else:
+            pages = list(enumerate(dictionary.iter_pages(key, args.page_size)))
+        if not pages or not pages[0][1]:
+            print(f"{key}: (no candidates)")
+        for number, words in pages:
+            print(f"{key} [page {number}]: {', '.join(words)}")
+    dictionary.close()